@@ -0,0 +1,91 @@
+"""
+Response encoding micro-benchmark: ModelResponse against FastAPI's response_model path
+(serialize_response, jsonable_encoder, JSONResponse) for the trip and place list reads.
+
+    cd backend && python benchmarks/responses.py
+
+Runs on a throwaway storage folder, with 50 places and a trip of 30 days and 200 items.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND))
+
+
+def bench(label: str, fn, n: int):
+    fn()
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    print(f"{label}: {(time.perf_counter() - start) / n * 1e3:.2f} ms")
+
+
+def main():
+    # Settings paths are relative (storage/...), as in tests/conftest.py
+    root = Path(tempfile.mkdtemp(prefix="trip-bench-"))
+    (root / "frontend").mkdir()
+    alembic_ini = (BACKEND / "alembic.ini").read_text().replace("%(here)s", str(BACKEND))
+    (root / "alembic.ini").write_text(alembic_ini)
+    os.chdir(root)
+
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import APIRoute, serialize_response
+    from fastapi.testclient import TestClient
+    from sqlmodel import select
+
+    from trip.db.core import RoutingSession
+    from trip.main import app
+    from trip.models.models import Trip, TripRead
+    from trip.routers import trips
+    from trip.routers.trips import _trip_read_options
+    from trip.utils.responses import ModelResponse
+
+    with TestClient(app) as client:
+        token = client.post("/api/auth/register", json={"username": "bench", "password": "password"})
+        headers = {"Authorization": f"Bearer {token.json()['access_token']}"}
+        category_id = client.get("/api/categories", headers=headers).json()[0]["id"]
+        place_ids = [
+            client.post(
+                "/api/places",
+                headers=headers,
+                json={"name": f"P{i}", "lat": 1.0, "lng": 2.0, "place": "x", "category_id": category_id},
+            ).json()["id"]
+            for i in range(50)
+        ]
+        trip_id = client.post("/api/trips", headers=headers, json={"name": "T"}).json()["id"]
+        client.put(f"/api/trips/{trip_id}", headers=headers, json={"name": "T", "place_ids": place_ids})
+        for d in range(30):
+            day = client.post(f"/api/trips/{trip_id}/days", headers=headers, json={"label": f"D{d}"}).json()
+            for i in range(7 if d < 20 else 6):
+                item = {"text": f"I{i}", "time": "09", "place": place_ids[(d + i) % 50]}
+                client.post(f"/api/trips/{trip_id}/days/{day['id']}/items", headers=headers, json=item)
+
+        path = "/api/trips/{trip_id}"
+        route = next(r for r in trips.router.routes if isinstance(r, APIRoute) and r.path == path)
+        with RoutingSession() as session:
+            trip = session.exec(select(Trip).options(*_trip_read_options()).where(Trip.id == trip_id)).one()
+            content = TripRead.serialize(trip)
+
+            def fastapi_path():
+                encode = serialize_response(field=route.response_field, response_content=content)
+                validated = asyncio.run(encode)
+                return JSONResponse(validated).body
+
+            assert fastapi_path() == ModelResponse(content).body
+            bench("trip, serialize", lambda: TripRead.serialize(trip), 20)
+            bench("trip, response_model + JSONResponse", fastapi_path, 20)
+            bench("trip, ModelResponse", lambda: ModelResponse(content).body, 20)
+
+        # Served from the trip read cache after the first call
+        bench("GET /api/trips/{id}", lambda: client.get(f"/api/trips/{trip_id}", headers=headers), 20)
+        bench("GET /api/places", lambda: client.get("/api/places", headers=headers), 20)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import os
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).parent.parent
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    # Settings paths are relative (storage/...): the app runs from an empty folder
+    root = tmp_path_factory.mktemp("trip")
+    (root / "frontend").mkdir()
+    # Loaded from the working directory, migrations stay in the source tree
+    alembic_ini = (BACKEND / "alembic.ini").read_text().replace("%(here)s", str(BACKEND))
+    (root / "alembic.ini").write_text(alembic_ini)
+    os.chdir(root)
+
+    from trip.main import app
+
+    return app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def register(client):
+    def register(username: str) -> dict:
+        response = client.post("/api/auth/register", json={"username": username, "password": "password"})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return register
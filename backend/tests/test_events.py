@@ -0,0 +1,73 @@
+import socket
+import threading
+import time
+from contextlib import ExitStack
+
+import httpx
+import pytest
+import uvicorn
+
+
+@pytest.fixture
+def server_url(app, client):
+    # The TestClient buffers whole bodies, streams need a server. Lifespan ran with the client
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, port=port, lifespan="off", log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join()
+
+
+def test_event_streams_hold_no_connection(client, register, server_url):
+    from trip.db.core import get_read_engine
+
+    headers = register("events")
+    trip_id = client.post("/api/trips", headers=headers, json={"name": "T"}).json()["id"]
+    token = client.post(f"/api/trips/{trip_id}/share", headers=headers, json={"is_full_access": False})
+    token = token.json()["url"].rsplit("/", 1)[-1]
+
+    pool = get_read_engine().pool
+    streams = pool.size() + pool._max_overflow + 1
+    with httpx.Client(base_url=server_url, timeout=5) as http, ExitStack() as stack:
+        for i in range(streams):
+            url = f"/api/trips/{trip_id}/events" if i % 2 else f"/api/trips/shared/{token}/events"
+            response = stack.enter_context(http.stream("GET", url, headers=headers))
+            assert response.status_code == 200
+        assert http.get(f"/api/trips/{trip_id}", headers=headers).status_code == 200
+
+
+def _events(lines) -> list[str]:
+    # Event names until the server closes the stream
+    return [line.removeprefix("event: ") for line in lines if line.startswith("event: ")]
+
+
+def _subscribed(response):
+    # Lines after the first message: the stream is subscribed
+    lines = response.iter_lines()
+    assert "event: revision" in iter(lambda: next(lines), "")
+    return lines
+
+
+def test_event_streams_close_when_access_is_removed(client, register, server_url):
+    headers = register("events-closed")
+    trip_id = client.post("/api/trips", headers=headers, json={"name": "T"}).json()["id"]
+    token = client.post(f"/api/trips/{trip_id}/share", headers=headers, json={"is_full_access": False})
+    token = token.json()["url"].rsplit("/", 1)[-1]
+
+    with httpx.Client(base_url=server_url, timeout=5) as http:
+        with http.stream("GET", f"/api/trips/shared/{token}/events") as shared:
+            lines = _subscribed(shared)
+            assert client.delete(f"/api/trips/{trip_id}/share", headers=headers).status_code == 200
+            assert _events(lines) == ["change"]
+        assert http.get(f"/api/trips/shared/{token}/events").status_code == 404
+
+        with http.stream("GET", f"/api/trips/{trip_id}/events", headers=headers) as owner:
+            lines = _subscribed(owner)
+            assert client.delete(f"/api/trips/{trip_id}", headers=headers).status_code == 200
+            assert _events(lines) == ["deleted"]
@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).parent.parent
+
+# Imported on first use only, not by every worker at startup
+LAZY_MODULES = ("PIL", "httpx", "argon2", "pyotp", "authlib")
+
+
+def test_startup_does_not_import_heavy_modules(tmp_path):
+    (tmp_path / "frontend").mkdir()
+    code = f"import sys, trip.main; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": str(BACKEND)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == ""
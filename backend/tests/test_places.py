@@ -0,0 +1,40 @@
+import json
+
+
+def test_read_places_with_category_of_another_user(client, register):
+    headers = register("places")
+    other_category = client.get("/api/categories", headers=register("places-other")).json()[0]
+    place = {"name": "P", "lat": 1.0, "lng": 2.0, "place": "x", "category_id": other_category["id"]}
+    assert client.post("/api/places", headers=headers, json=place).status_code == 200
+
+    places = client.get("/api/places", headers=headers).json()
+    assert places[0]["category"] == other_category
+
+    assert client.get("/api/places", headers=headers, params={"stream": True}).json() == places
+    response = client.get("/api/places", headers={**headers, "Accept": "application/x-ndjson"})
+    assert [json.loads(line) for line in response.text.splitlines()] == places
+
+    columnar = client.get("/api/places", headers=headers, params={"format": "columnar"}).json()
+    assert columnar["categories"][str(other_category["id"])] == other_category
+
+
+def test_streamed_places_hold_one_connection(client, register, monkeypatch):
+    from trip.db.core import get_read_engine
+    from trip.routers import places
+
+    headers = register("places-stream")
+    category_id = client.get("/api/categories", headers=headers).json()[0]["id"]
+    place = {"name": "P", "lat": 1.0, "lng": 2.0, "place": "x", "category_id": category_id}
+    client.post("/api/places", headers=headers, json=place)
+
+    checked_out = []
+    iter_place_rows = places.iter_place_rows
+
+    def record(*args):
+        for row in iter_place_rows(*args):
+            checked_out.append(get_read_engine().pool.checkedout())
+            yield row
+
+    monkeypatch.setattr(places, "iter_place_rows", record)
+    assert client.get("/api/places", headers=headers, params={"stream": True}).status_code == 200
+    assert checked_out == [1]
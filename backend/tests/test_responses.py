@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from starlette.requests import Request
+
+from trip.utils.responses import ModelResponse, wants_msgpack
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    # Contents encoded by the fast path, to be encoded again the way FastAPI does
+    contents = []
+    render = ModelResponse.render
+
+    def record(self, content) -> bytes:
+        contents.append(content)
+        return render(self, content)
+
+    monkeypatch.setattr(ModelResponse, "render", record)
+    return contents
+
+
+def fastapi_body(router, path: str, content) -> bytes:
+    # response_model validation, jsonable_encoder, then JSONResponse
+    route = next(r for r in router.routes if isinstance(r, APIRoute) and r.path == path and "GET" in r.methods)
+    validated = asyncio.run(serialize_response(field=route.response_field, response_content=content))
+    return JSONResponse(validated).body
+
+
+def test_model_response_matches_response_model(client, register, rendered):
+    from trip.routers import places, trips
+
+    headers = register("responses")
+    category_id = client.get("/api/categories", headers=headers).json()[0]["id"]
+    place = {"name": "É", "lat": 1.5, "lng": -2.25, "place": "x", "category_id": category_id, "price": 12.5}
+    place_id = client.post("/api/places", headers=headers, json=place).json()["id"]
+    trip_id = client.post("/api/trips", headers=headers, json={"name": "T"}).json()["id"]
+    client.put(f"/api/trips/{trip_id}", headers=headers, json={"name": "T", "place_ids": [place_id]})
+    day = client.post(f"/api/trips/{trip_id}/days", headers=headers, json={"label": "D", "dt": "2026-05-01"})
+    day_id = day.json()["id"]
+    for item in ({"text": "I", "place": place_id, "status": "booked", "time": "09"}, {"text": "J"}):
+        response = client.post(f"/api/trips/{trip_id}/days/{day_id}/items", headers=headers, json=item)
+        assert response.status_code == 200, response.text
+    booking = {"label": "B", "type": "flight"}
+    client.post(f"/api/trips/{trip_id}/days/{day_id}/bookings", headers=headers, json=booking)
+
+    for url, router, path in (
+        (f"/api/trips/{trip_id}", trips.router, "/api/trips/{trip_id}"),
+        ("/api/places", places.router, "/api/places"),
+    ):
+        rendered.clear()
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200, response.text
+        assert response.content == fastapi_body(router, path, rendered[-1])
+
+
+@pytest.mark.parametrize(
+    "accept, msgpack",
+    [
+        ("application/msgpack", True),
+        ("application/x-msgpack, application/json;q=0.5", True),
+        ("application/msgpack;q=0, application/json", False),
+        ("application/json, application/msgpack;q=0.8", False),
+        ("application/msgpack-v2", False),
+        ("text/html, application/xhtml+xml, */*;q=0.8", False),
+        ("*/*;q=0.1, application/msgpack;q=0.5", True),
+        ("", False),
+    ],
+)
+def test_accept_negotiation_honors_q_values(accept, msgpack):
+    request = Request({"type": "http", "headers": [(b"accept", accept.encode())]})
+    assert wants_msgpack(request) is msgpack
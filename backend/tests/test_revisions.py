@@ -0,0 +1,48 @@
+def test_linking_a_place_bumps_the_trips_showing_it(client, register):
+    headers = register("revisions")
+    category_id = client.get("/api/categories", headers=headers).json()[0]["id"]
+    place = {"name": "P", "lat": 1.0, "lng": 2.0, "place": "x", "category_id": category_id}
+    place_id = client.post("/api/places", headers=headers, json=place).json()["id"]
+    shown, linked = (client.post("/api/trips", headers=headers, json={"name": n}).json()["id"] for n in "AB")
+    client.put(f"/api/trips/{shown}", headers=headers, json={"name": "A", "place_ids": [place_id]})
+    before = client.get(f"/api/trips/{shown}", headers=headers)
+    assert before.json()["places"][0]["trip_count"] == 1
+
+    for place_ids, trip_count in (([place_id], 2), ([], 1)):
+        client.put(f"/api/trips/{linked}", headers=headers, json={"name": "B", "place_ids": place_ids})
+        etag = before.headers["ETag"]
+        after = client.get(f"/api/trips/{shown}", headers={**headers, "If-None-Match": etag})
+        assert after.status_code == 200
+        assert after.json()["places"][0]["trip_count"] == trip_count
+        before = after
+
+    client.put(f"/api/trips/{linked}", headers=headers, json={"name": "B", "place_ids": [place_id]})
+    before = client.get(f"/api/trips/{shown}", headers=headers)
+    assert client.delete(f"/api/trips/{linked}", headers=headers).status_code == 200
+    after = client.get(f"/api/trips/{shown}", headers={**headers, "If-None-Match": before.headers["ETag"]})
+    assert after.status_code == 200
+    assert after.json()["places"][0]["trip_count"] == 1
+
+
+def test_deleted_trip_ids_are_not_given_again(client, register):
+    headers = register("revisions-ids")
+    trip_id = client.post("/api/trips", headers=headers, json={"name": "T"}).json()["id"]
+    etag = client.get(f"/api/trips/{trip_id}", headers=headers).headers["ETag"]
+    assert client.delete(f"/api/trips/{trip_id}", headers=headers).status_code == 200
+
+    new_trip_id = client.post("/api/trips", headers=headers, json={"name": "T"}).json()["id"]
+    assert new_trip_id != trip_id
+    assert client.get(f"/api/trips/{new_trip_id}", headers=headers).headers["ETag"] != etag
+
+
+def test_etags_change_with_the_release(client, register, monkeypatch):
+    from trip.utils import responses
+
+    headers = register("revisions-release")
+    trip_id = client.post("/api/trips", headers=headers, json={"name": "T"}).json()["id"]
+    etag = client.get(f"/api/trips/{trip_id}", headers=headers).headers["ETag"]
+    assert client.get(f"/api/trips/{trip_id}", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    # An upgrade may render the same revision differently
+    monkeypatch.setattr(responses, "__version__", "0.0.0-next")
+    assert client.get(f"/api/trips/{trip_id}", headers={**headers, "If-None-Match": etag}).status_code == 200
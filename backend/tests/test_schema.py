@@ -0,0 +1,71 @@
+import json
+import subprocess
+import sys
+
+from conftest import BACKEND
+
+# Run in a fresh process per database: the engine is bound to the working directory settings
+DUMP_SCHEMA = """
+import json, sys
+from pathlib import Path
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import inspect
+from sqlmodel import SQLModel
+
+from trip.db.core import _alembic_upgrade, get_engine
+
+Path("storage").mkdir()
+engine = get_engine()
+if sys.argv[1] == "chain":
+    command.upgrade(Config("alembic.ini"), "head")
+else:
+    _alembic_upgrade(engine)
+
+schema = {}
+with engine.connect() as conn:
+    inspector = inspect(conn)
+    for table in inspector.get_table_names():
+        schema[table] = {
+            # Column order differs once migrations add columns. Lengths are ignored by SQLite: the models
+            # give enums a VARCHAR(n), the migrations a VARCHAR
+            "columns": sorted(
+                [c["name"], str(c["type"]).split("(")[0], c["nullable"], (c["default"] or "").strip("'")]
+                for c in inspector.get_columns(table)
+            ),
+            "pk": inspector.get_pk_constraint(table)["constrained_columns"],
+            "fks": sorted(
+                [fk["constrained_columns"], fk["referred_table"]] for fk in inspector.get_foreign_keys(table)
+            ),
+            "indexes": sorted([i["column_names"], bool(i["unique"])] for i in inspector.get_indexes(table)),
+        }
+    context = MigrationContext.configure(conn, opts={"compare_server_default": True, "compare_type": True})
+    diff = [str(d) for d in compare_metadata(context, SQLModel.metadata)]
+print(json.dumps({"schema": schema, "diff": diff}))
+"""
+
+
+def _schema(tmp_path, mode: str) -> dict:
+    folder = tmp_path / mode
+    folder.mkdir()
+    alembic_ini = (BACKEND / "alembic.ini").read_text().replace("%(here)s", str(BACKEND))
+    (folder / "alembic.ini").write_text(alembic_ini)
+    result = subprocess.run(
+        [sys.executable, "-c", DUMP_SCHEMA, mode],
+        cwd=folder,
+        env={"PYTHONPATH": str(BACKEND)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_new_databases_match_the_migrations(tmp_path):
+    # New databases are created from the models (db.core._alembic_upgrade), existing ones migrated
+    chain, created = _schema(tmp_path, "chain"), _schema(tmp_path, "created")
+    assert chain["diff"] == []
+    assert created["schema"] == chain["schema"]
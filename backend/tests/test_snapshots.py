@@ -0,0 +1,60 @@
+from sqlalchemy import update
+
+
+def _share_url(client, headers, trip_id) -> str:
+    token = client.post(f"/api/trips/{trip_id}/share", headers=headers, json={"is_full_access": False})
+    return f"/api/trips/shared/{token.json()['url'].rsplit('/', 1)[-1]}"
+
+
+def test_share_snapshots_are_served_without_the_database(client, register):
+    from trip.db.core import get_engine
+    from trip.models.models import Trip
+
+    headers = register("snapshots")
+    trip_id = client.post("/api/trips", headers=headers, json={"name": "T"}).json()["id"]
+    url = _share_url(client, headers, trip_id)
+    rendered = client.get(url)
+    assert rendered.json()["name"] == "T"
+
+    # Not seen by the snapshot: no commit hook ran
+    with get_engine().begin() as conn:
+        conn.execute(update(Trip).where(Trip.id == trip_id).values(name="U"))
+    snapshot = client.get(url)
+    assert snapshot.json()["name"] == "T"
+    assert snapshot.headers["ETag"] == rendered.headers["ETag"]
+    assert snapshot.headers["Cache-Control"] == "no-cache"
+    assert client.get(url, headers={"If-None-Match": snapshot.headers["ETag"]}).status_code == 304
+    assert client.get(snapshot.headers["Content-Location"]).json()["name"] == "T"
+
+    client.put(f"/api/trips/{trip_id}", headers=headers, json={"name": "V"})
+    assert client.get(url).json()["name"] == "V"
+    assert client.get(snapshot.headers["Content-Location"]).status_code == 404
+
+
+def test_share_snapshots_are_removed_with_their_link(client, register):
+    from trip.utils.snapshots import get_share_snapshots
+
+    headers = register("snapshots-removed")
+    trips = (client.post("/api/trips", headers=headers, json={"name": n}).json()["id"] for n in "AB")
+    revoked, deleted = trips
+    urls = {trip_id: _share_url(client, headers, trip_id) for trip_id in (revoked, deleted)}
+    for url in urls.values():
+        client.get(url)
+        assert get_share_snapshots().get(url.rsplit("/", 1)[-1])
+
+    assert client.delete(f"/api/trips/{revoked}/share", headers=headers).status_code == 200
+    assert client.delete(f"/api/trips/{deleted}", headers=headers).status_code == 200
+    for url in urls.values():
+        assert get_share_snapshots().get(url.rsplit("/", 1)[-1]) is None
+        assert client.get(url).status_code == 404
+
+
+def test_share_snapshots_of_other_releases_are_dropped(tmp_path):
+    from trip.utils.snapshots import ShareSnapshots
+
+    (tmp_path / "0.0.1" / "token").mkdir(parents=True)
+    (tmp_path / "0.0.1" / "token" / "1-1.json").write_bytes(b"{}")
+    snapshots = ShareSnapshots(str(tmp_path))
+    snapshots.start()
+    assert snapshots.get("token") is None
+    assert not (tmp_path / "0.0.1").exists()
@@ -0,0 +1,82 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+
+@contextmanager
+def count_queries():
+    from trip.db.core import get_engine, get_read_engine
+
+    count = {"queries": 0}
+
+    def before_cursor_execute(*args):
+        count["queries"] += 1
+
+    engines = {get_engine(), get_read_engine()}
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield count
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def uncached(monkeypatch):
+    # Every read renders the trip from the database
+    from trip.utils.cache import get_trip_read_cache
+    from trip.utils.snapshots import get_share_snapshots
+
+    monkeypatch.setattr(get_trip_read_cache(), "max_bytes", 0)
+    monkeypatch.setattr(get_share_snapshots(), "get", lambda token: None)
+    monkeypatch.setattr(get_share_snapshots(), "publish", lambda *args: False)
+
+
+def test_trip_reads_do_not_query_per_row(client, register, uncached):
+    headers = register("queries")
+    member_headers = register("queries-member")
+    categories = client.get("/api/categories", headers=headers).json()
+    place_ids = []
+    for i in range(6):
+        category_id = categories[i % 3]["id"]
+        place = {"name": f"P{i}", "lat": 1.0, "lng": 2.0, "place": "x", "category_id": category_id}
+        place_ids.append(client.post("/api/places", headers=headers, json=place).json()["id"])
+    trip_id = client.post("/api/trips", headers=headers, json={"name": "T"}).json()["id"]
+    client.put(f"/api/trips/{trip_id}", headers=headers, json={"name": "T", "place_ids": place_ids})
+    client.post(f"/api/trips/{trip_id}/members", headers=headers, json={"user": "queries-member"})
+    client.post(f"/api/trips/{trip_id}/members/accept", headers=member_headers)
+    token = client.post(f"/api/trips/{trip_id}/share", headers=headers, json={"is_full_access": True})
+    token = token.json()["url"].rsplit("/", 1)[-1]
+
+    def grow(days: int, items_per_day: int):
+        for d in range(days):
+            day = client.post(f"/api/trips/{trip_id}/days", headers=headers, json={"label": f"D{d}"})
+            day_id = day.json()["id"]
+            for i in range(items_per_day):
+                response = client.post(
+                    f"/api/trips/{trip_id}/days/{day_id}/items",
+                    headers=headers,
+                    json={"text": f"I{i}", "place": place_ids[i % len(place_ids)], "price": 1.5},
+                )
+                assert response.status_code == 200, response.text
+            response = client.post(
+                f"/api/trips/{trip_id}/days/{day_id}/bookings", headers=headers, json={"label": f"B{d}"}
+            )
+            assert response.status_code == 200, response.text
+
+    def queries(url: str, headers: dict | None = None) -> int:
+        with count_queries() as count:
+            response = client.get(url, headers=headers)
+        assert response.status_code == 200, response.text
+        return count["queries"]
+
+    grow(days=4, items_per_day=6)
+    small = queries(f"/api/trips/{trip_id}", headers), queries(f"/api/trips/shared/{token}")
+    grow(days=8, items_per_day=6)
+    trip = client.get(f"/api/trips/{trip_id}", headers=headers).json()
+    assert {place["trip_count"] for place in trip["places"]} == {1}
+    assert {item["place"]["trip_count"] for item in trip["days"][-1]["items"]} == {1}
+    large = queries(f"/api/trips/{trip_id}", headers), queries(f"/api/trips/shared/{token}")
+    assert large == small
@@ -0,0 +1,11 @@
+def test_only_the_trips_list_reports_aggregates(client, register):
+    headers = register("trips")
+    created = client.post("/api/trips", headers=headers, json={"name": "T"}).json()
+    assert "place_count" not in created and "total_price" not in created
+
+    url = f"/api/trips/{created['id']}/days"
+    day_id = client.post(url, headers=headers, json={"label": "D", "dt": "2026-05-01"}).json()["id"]
+    client.post(f"{url}/{day_id}/items", headers=headers, json={"text": "I", "price": 12.5})
+    (summary,) = client.get("/api/trips", headers=headers).json()
+    assert (summary["start_date"], summary["end_date"]) == ("2026-05-01", "2026-05-01")
+    assert (summary["place_count"], summary["item_count"], summary["total_price"]) == (0, 1, 12.5)
@@ -0,0 +1,32 @@
+"""db maintenance runs
+
+Revision ID: 5d1e8a4f7c20
+Revises: 86c592fb0009
+Create Date: 2026-10-18 10:02:17.318450
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5d1e8a4f7c20"
+down_revision = "86c592fb0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "dbmaintenance",
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("duration_ms", sa.Integer(), nullable=False),
+        sa.Column("bytes_reclaimed", sa.Integer(), nullable=False),
+        sa.Column("vacuumed", sa.Boolean(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_dbmaintenance")),
+    )
+
+
+def downgrade():
+    op.drop_table("dbmaintenance")
@@ -0,0 +1,26 @@
+"""trip revision
+
+Revision ID: 9b3f6c1d2e47
+Revises: 5d1e8a4f7c20
+Create Date: 2026-10-18 14:21:40.512093
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9b3f6c1d2e47"
+down_revision = "5d1e8a4f7c20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("trip", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("revision", sa.Integer(), server_default="0", nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table("trip", schema=None) as batch_op:
+        batch_op.drop_column("revision")
@@ -0,0 +1,43 @@
+"""trip change log
+
+Revision ID: c4e8a2b91f35
+Revises: 9b3f6c1d2e47
+Create Date: 2026-10-18 16:05:12.774301
+
+"""
+
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c4e8a2b91f35"
+down_revision = "9b3f6c1d2e47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "tripchange",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("trip_id", sa.Integer(), nullable=False),
+        sa.Column("revision", sa.Integer(), nullable=False),
+        sa.Column("entity", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("deleted", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["trip_id"], ["trip.id"], name=op.f("fk_tripchange_trip_id_trip"), ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_tripchange")),
+    )
+    with op.batch_alter_table("tripchange", schema=None) as batch_op:
+        batch_op.create_index("idx_tripchange_trip_revision", ["trip_id", "revision"], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table("tripchange", schema=None) as batch_op:
+        batch_op.drop_index("idx_tripchange_trip_revision")
+
+    op.drop_table("tripchange")
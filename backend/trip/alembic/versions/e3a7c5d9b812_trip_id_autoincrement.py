@@ -0,0 +1,32 @@
+"""trip id autoincrement
+
+Revision ID: e3a7c5d9b812
+Revises: c4e8a2b91f35
+Create Date: 2026-10-18 18:42:09.615207
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e3a7c5d9b812"
+down_revision = "c4e8a2b91f35"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # PostgreSQL sequences never give an id twice. On SQLite the table is recreated (foreign keys are
+    # off during migrations, see env.py): ids freed before this revision above the highest remaining one
+    # can still be given once.
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    with op.batch_alter_table("trip", recreate="always", table_kwargs={"sqlite_autoincrement": True}):
+        pass
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    with op.batch_alter_table("trip", recreate="always", table_kwargs={"sqlite_autoincrement": False}):
+        pass
@@ -1,66 +1,318 @@
 import asyncio
+import fcntl
+import logging
+import re
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
-from alembic import command
-from alembic.config import Config
-from sqlalchemy import event, text
+from sqlalchemy import (URL, Delete, Insert, TextClause, Update, event,
+                        inspect, make_url, text)
 from sqlalchemy.engine import Engine
-from sqlmodel import Session, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import Session, SQLModel, create_engine
 
 from ..config import get_settings
 from ..models.models import Category
+from . import revisions  # noqa: F401 (Trip.revision Session listeners)
 from .migrations import run_migrations
 
+logger = logging.getLogger(__name__)
+
+ALEMBIC_VERSIONS_FOLDER = Path(__file__).parent.parent / "alembic" / "versions"
+_REVISION_RE = re.compile(r"^(down_revision|revision)\s*=\s*['\"]([0-9a-f]+)['\"]", re.MULTILINE)
+
 _engine = None
+_read_engine = None
+_async_engine = None
+
+# Writer connection held longer than this is logged, it delays every queued write
+SLOW_WRITE_MS = 500
+SQLITE_SYNCHRONOUS = {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3}
+SQLITE_TEMP_STORE = {"DEFAULT": 0, "FILE": 1, "MEMORY": 2}
+# Read connections opened past SQLITE_READ_POOL_SIZE under load, per read engine (sync and async).
+# A worker holds at most 1 + 2 * (SQLITE_READ_POOL_SIZE + SQLITE_READ_MAX_OVERFLOW) connections
+SQLITE_READ_MAX_OVERFLOW = 10
+# pg_advisory_lock key serializing migrations across API nodes
+MIGRATION_LOCK_KEY = 7_472_697
+
+
+def get_database_url() -> URL:
+    if database_url := get_settings().DATABASE_URL:
+        url = make_url(database_url)
+        if url.drivername in ("postgres", "postgresql"):
+            url = url.set(drivername="postgresql+psycopg")
+        return url
+    return make_url(f"sqlite:///{get_settings().SQLITE_FILE}")
+
+
+def is_sqlite() -> bool:
+    return get_database_url().get_backend_name() == "sqlite"
 
 
 def _db_needs_stamp(engine: Engine) -> bool:
-    with engine.connect() as conn:
-        result = conn.execute(
-            text("SELECT name FROM sqlite_master WHERE type='table' AND name='alembic_version';")
-        )
-        return result.fetchone() is None
+    return not inspect(engine).has_table("alembic_version")
 
 
 def get_engine():
     global _engine
-    if not _engine:
+    if _engine:
+        return _engine
+
+    if not is_sqlite():
         _engine = create_engine(
-            f"sqlite:///{get_settings().SQLITE_FILE}",
-            connect_args={"check_same_thread": False},
+            get_database_url(),
+            pool_size=get_settings().DATABASE_POOL_SIZE,
+            max_overflow=get_settings().DATABASE_MAX_OVERFLOW,
+            pool_pre_ping=True,
         )
+        return _engine
+
+    # Single writer connection: concurrent write transactions queue on the pool (FIFO)
+    # instead of spinning on SQLite busy_timeout
+    _engine = create_engine(
+        get_database_url(),
+        connect_args={"check_same_thread": False},
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=get_settings().SQLITE_WRITE_TIMEOUT,
+    )
+    event.listen(_engine, "connect", set_sqlite_pragma)
+    event.listen(_engine, "checkout", _writer_checkout)
+    event.listen(_engine, "checkin", _writer_checkin)
     return _engine
 
 
-@event.listens_for(Engine, "connect")
+def get_read_engine():
+    # PostgreSQL has no single-writer constraint, reads and writes share the pool
+    if not is_sqlite():
+        return get_engine()
+
+    global _read_engine
+    if not _read_engine:
+        _read_engine = create_engine(
+            get_database_url(),
+            connect_args={"check_same_thread": False},
+            pool_size=get_settings().SQLITE_READ_POOL_SIZE,
+            max_overflow=SQLITE_READ_MAX_OVERFLOW,
+        )
+        event.listen(_read_engine, "connect", set_sqlite_pragma)
+        event.listen(_read_engine, "connect", _set_query_only)
+    return _read_engine
+
+
+def _set_query_only(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+def _writer_checkout(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info["checkout_at"] = time.perf_counter()
+
+
+def _writer_checkin(dbapi_connection, connection_record):
+    checkout_at = connection_record.info.pop("checkout_at", None)
+    if checkout_at is None:
+        return
+    held_ms = (time.perf_counter() - checkout_at) * 1000
+    if held_ms > SLOW_WRITE_MS:
+        logger.warning(f"[DB WRITER] Writer connection held for {held_ms:.0f}ms")
+
+
+class RoutingSession(Session):
+    """
+    Session reading through the query_only pool and writing through the single writer.
+    Once a transaction writes, it stays on the writer until it ends (read-your-writes).
+    """
+
+    _writing = False
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        if self._writing or self._flushing or isinstance(clause, (Insert, Update, Delete, TextClause)):
+            self._writing = True
+            return get_engine()
+        return get_read_engine()
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def release_writer(session, transaction):
+    if transaction.parent is None:
+        session._writing = False
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine:
+        return _async_engine
+
+    if not is_sqlite():
+        # psycopg 3 serves both the sync and async engines
+        _async_engine = create_async_engine(
+            get_database_url(),
+            pool_size=get_settings().DATABASE_POOL_SIZE,
+            max_overflow=get_settings().DATABASE_MAX_OVERFLOW,
+            pool_pre_ping=True,
+        )
+        return _async_engine
+
+    # Reads only: async routes write through the single writer (get_engine) in a thread, a second
+    # writer connection would contend with it on busy_timeout again
+    _async_engine = create_async_engine(
+        get_database_url().set(drivername="sqlite+aiosqlite"),
+        pool_size=get_settings().SQLITE_READ_POOL_SIZE,
+        max_overflow=SQLITE_READ_MAX_OVERFLOW,
+    )
+    event.listen(_async_engine.sync_engine, "connect", set_sqlite_pragma)
+    event.listen(_async_engine.sync_engine, "connect", _set_query_only)
+    return _async_engine
+
+
+async def dispose_async_engine():
+    global _async_engine
+    if _async_engine:
+        await _async_engine.dispose()
+        _async_engine = None
+
+
+def sqlite_pragmas() -> dict[str, int]:
+    # Connection profile, values as SQLite reports them back (PRAGMA <name>)
+    settings = get_settings()
+    return {
+        "foreign_keys": 1,
+        "busy_timeout": 10000,
+        "synchronous": SQLITE_SYNCHRONOUS[settings.SQLITE_SYNCHRONOUS],
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": SQLITE_TEMP_STORE[settings.SQLITE_TEMP_STORE],
+        "wal_autocheckpoint": settings.SQLITE_WAL_AUTOCHECKPOINT,
+    }
+
+
 def set_sqlite_pragma(dbapi_connection, connection_record):
     cursor = dbapi_connection.cursor()
-    cursor.execute("PRAGMA foreign_keys=ON")
+    # Only applies to new databases (before the first table), existing ones are converted by maintenance
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
     cursor.execute("PRAGMA journal_mode=WAL")
-    cursor.execute("PRAGMA busy_timeout=10000")
+    for name, value in sqlite_pragmas().items():
+        cursor.execute(f"PRAGMA {name}={value}")
     cursor.close()
 
 
-async def init_and_migrate_db():
+def read_sqlite_pragmas(engine: Engine) -> dict[str, int | str]:
+    with engine.connect() as conn:
+        pragmas = {"journal_mode": conn.exec_driver_sql("PRAGMA journal_mode").scalar()}
+        for name in sqlite_pragmas():
+            pragmas[name] = conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+    return pragmas
+
+
+def sqlite_pragma_mismatches(actual: dict[str, int | str]) -> list[str]:
+    expected = {"journal_mode": "wal", **sqlite_pragmas()}
+    return [f"{name}={actual[name]} (expected {value})" for name, value in expected.items() if actual[name] != value]
+
+
+def verify_sqlite_pragmas():
+    # e.g. mmap_size is capped (or 0) when SQLite is built with a lower SQLITE_MAX_MMAP_SIZE
+    if not is_sqlite():
+        return
+    for engine in (get_engine(), get_read_engine()):
+        for mismatch in sqlite_pragma_mismatches(read_sqlite_pragmas(engine)):
+            logger.warning(f"[DB] PRAGMA {mismatch}")
+
+
+def _alembic_head() -> str | None:
+    # Read revision ids from the versions files, avoids loading Alembic just to compare
+    revision_ids, down_revisions = set(), set()
+    for fp in ALEMBIC_VERSIONS_FOLDER.glob("*.py"):
+        for key, rev in _REVISION_RE.findall(fp.read_text()):
+            (revision_ids if key == "revision" else down_revisions).add(rev)
+
+    heads = revision_ids - down_revisions
+    return heads.pop() if len(heads) == 1 else None
+
+
+def _db_revision(engine: Engine) -> str | None:
+    if _db_needs_stamp(engine):
+        return None
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def _db_is_empty(engine: Engine) -> bool:
+    if is_sqlite() and not Path(get_settings().SQLITE_FILE).exists():
+        return True
+    return not inspect(engine).get_table_names()
+
+
+def _db_at_head(engine: Engine) -> bool:
+    if is_sqlite() and not Path(get_settings().SQLITE_FILE).exists():
+        return False
+    head = _alembic_head()
+    return head is not None and _db_revision(engine) == head
+
+
+@contextmanager
+def _migration_lock(engine: Engine):
+    # Several workers boot at once, only one migrates while the others wait
+    if not is_sqlite():
+        # API nodes share the database but not the filesystem
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        return
+
+    lock_fp = Path(f"{get_settings().SQLITE_FILE}.migrate.lock")
+    lock_fp.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_fp, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _alembic_upgrade(engine: Engine):
+    from alembic import command
+    from alembic.config import Config
+
     alembic_cfg = Config("alembic.ini")
-    sqlite_file = Path(get_settings().SQLITE_FILE)
+
+    if _db_is_empty(engine):
+        # DB does not exist: create the head schema in one step instead of replaying
+        # every revision, then stamp head. Existing DBs still go through the chain.
+        SQLModel.metadata.create_all(engine)
+        command.stamp(alembic_cfg, "head")
+        return
+
+    if _db_needs_stamp(engine):
+        # DB exists, but Alembic not initialized, we stamp
+        # b2ed4bf9c1b2 is the revision before Alembic introduction
+        command.stamp(alembic_cfg, "b2ed4bf9c1b2")
+
+    # Alembic already introduced, classic upgrade
+    command.upgrade(alembic_cfg, "head")
+
+
+def migrate_db(rerun: list[str] | None = None):
     engine = get_engine()
+    with _migration_lock(engine):
+        if _db_at_head(engine):
+            logger.info("[DB] Schema up to date, Alembic skipped")
+        else:
+            _alembic_upgrade(engine)
+
+        # Migrate / fill data if needed (e.g. fill missing image file_size)
+        with RoutingSession() as session:
+            run_migrations(session, rerun)
 
-    if not sqlite_file.exists():
-        # DB does not exist, upgrade to head
-        await asyncio.to_thread(command.upgrade, alembic_cfg, "head")
-    else:
-        if _db_needs_stamp(engine):
-            # DB exists, but Alembic not initialized, we stamp
-            # b2ed4bf9c1b2 is the revision before Alembic introduction
-            await asyncio.to_thread(command.stamp, alembic_cfg, "b2ed4bf9c1b2")
-
-        # Alembic already introduced, classic upgrade
-        await asyncio.to_thread(command.upgrade, alembic_cfg, "head")
-
-    # Migrate / fill data if needed (e.g. fill missing image file_size)
-    with Session(engine) as session:
-        run_migrations(session)
+
+async def init_and_migrate_db():
+    await asyncio.to_thread(migrate_db)
+    await asyncio.to_thread(verify_sqlite_pragmas)
 
 
 def init_user_data(session: Session, username: str):
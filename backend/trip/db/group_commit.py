@@ -0,0 +1,104 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy.sql.dml import UpdateBase
+
+from ..config import get_settings
+from .core import RoutingSession
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 64
+
+_committer = None
+_committer_lock = threading.Lock()
+
+
+class GroupCommitter:
+    """
+    Write-behind queue: small DML statements submitted within `window_ms` of each other
+    are executed in one transaction (one fsync). If the batch fails, its writes are replayed
+    one by one so only the faulty caller gets the error.
+    """
+
+    def __init__(self, window_ms: int):
+        self.window = window_ms / 1000
+        self._queue: queue.Queue[tuple[UpdateBase, Future] | None] = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="trip-group-commit", daemon=True)
+        self._thread.start()
+
+    def submit(self, stmt: UpdateBase) -> Future:
+        future = Future()
+        self._queue.put((stmt, future))
+        return future
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            deadline = time.monotonic() + self.window
+            while len(batch) < MAX_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._commit(batch)
+
+    def _commit(self, batch: list[tuple[UpdateBase, Future]]):
+        try:
+            with RoutingSession() as session:
+                rowcounts = [session.execute(stmt).rowcount for stmt, _ in batch]
+                session.commit()
+        except Exception as exc:
+            if len(batch) == 1:
+                logger.error(f"[GROUP COMMIT] Write failed: {exc}")
+                batch[0][1].set_exception(exc)
+                return
+
+            # Isolate the failing write(s): replay one transaction per write
+            for item in batch:
+                self._commit([item])
+            return
+
+        for (_, future), rowcount in zip(batch, rowcounts):
+            future.set_result(rowcount)
+
+
+def get_group_committer() -> GroupCommitter | None:
+    # Opt-in: disabled unless SQLITE_GROUP_COMMIT_MS > 0
+    global _committer
+    window_ms = get_settings().SQLITE_GROUP_COMMIT_MS
+    if window_ms <= 0:
+        return None
+
+    with _committer_lock:
+        if not _committer:
+            _committer = GroupCommitter(window_ms)
+    return _committer
+
+
+def stop_group_committer():
+    global _committer
+    with _committer_lock:
+        if _committer:
+            _committer.stop()
+            _committer = None
@@ -0,0 +1,126 @@
+import asyncio
+import fcntl
+import logging
+import time
+from contextlib import suppress
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import delete
+
+from ..config import get_settings
+from ..models.models import DbMaintenance
+from .core import RoutingSession, get_engine, is_sqlite
+
+logger = logging.getLogger(__name__)
+
+# Runs kept in the dbmaintenance table
+MAX_RUNS_KEPT = 30
+AUTO_VACUUM_INCREMENTAL = 2
+
+_task: asyncio.Task | None = None
+
+
+def _db_size() -> int:
+    db_file = Path(get_settings().SQLITE_FILE)
+    wal_file = db_file.with_name(f"{db_file.name}-wal")
+    return sum(fp.stat().st_size for fp in (db_file, wal_file) if fp.exists())
+
+
+def _run_maintenance() -> DbMaintenance:
+    started_at = datetime.now(UTC)
+    start = time.perf_counter()
+    size_before = _db_size()
+    vacuumed = False
+
+    # VACUUM and wal_checkpoint cannot run inside a transaction
+    with get_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() != AUTO_VACUUM_INCREMENTAL:
+            # DB created before incremental auto_vacuum: switching mode requires a one-time VACUUM
+            conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.exec_driver_sql("VACUUM")
+            vacuumed = True
+        # Frees one page per step: drain it on the DBAPI cursor, SQLAlchemy only steps it once
+        cursor = conn.connection.cursor()
+        cursor.execute("PRAGMA incremental_vacuum").fetchall()
+        cursor.close()
+
+        if conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").scalar():
+            conn.exec_driver_sql("PRAGMA optimize")
+        else:
+            # Never analyzed, optimize would only analyze tables it considers stale
+            conn.exec_driver_sql("ANALYZE")
+
+        busy, _, _ = conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").one()
+        if busy:
+            logger.warning("[DB MAINTENANCE] WAL checkpoint blocked by a reader, WAL not truncated")
+
+    db_maintenance = DbMaintenance(
+        started_at=started_at,
+        duration_ms=int((time.perf_counter() - start) * 1000),
+        bytes_reclaimed=max(size_before - _db_size(), 0),
+        vacuumed=vacuumed,
+    )
+    with RoutingSession() as session:
+        session.add(db_maintenance)
+        session.flush()
+        session.execute(delete(DbMaintenance).where(DbMaintenance.id <= db_maintenance.id - MAX_RUNS_KEPT))
+        session.commit()
+        session.refresh(db_maintenance)
+
+    logger.info(
+        f"[DB MAINTENANCE] Done in {db_maintenance.duration_ms}ms, {db_maintenance.bytes_reclaimed} bytes reclaimed"
+    )
+    return db_maintenance
+
+
+def run_maintenance() -> DbMaintenance | None:
+    # PostgreSQL relies on its own autovacuum
+    if not is_sqlite():
+        return None
+
+    lock_fp = Path(f"{get_settings().SQLITE_FILE}.maintenance.lock")
+    with open(lock_fp, "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            # Another worker is already running it
+            return None
+        try:
+            return _run_maintenance()
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _seconds_until(hour: int) -> float:
+    now = datetime.now(UTC)
+    next_run = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+async def _schedule(hour: int):
+    while True:
+        await asyncio.sleep(_seconds_until(hour))
+        try:
+            await asyncio.to_thread(run_maintenance)
+        except Exception as exc:
+            logger.error(f"[DB MAINTENANCE] Run failed: {exc}")
+
+
+def start_maintenance():
+    global _task
+    hour = get_settings().SQLITE_MAINTENANCE_HOUR
+    if not is_sqlite() or hour < 0:
+        return
+    _task = asyncio.create_task(_schedule(hour))
+
+
+async def stop_maintenance():
+    global _task
+    if _task:
+        _task.cancel()
+        with suppress(asyncio.CancelledError):
+            await _task
+        _task = None
@@ -4,7 +4,7 @@ from pathlib import Path
 from sqlmodel import Session, select
 
 from ..config import get_settings
-from ..models.models import Image, User
+from ..models.models import DataMigration, Image, User
 from ..utils.utils import backup_file
 
 logger = logging.getLogger(__name__)
@@ -70,7 +70,25 @@ def _001_image_file_size(session: Session):
     logger.warning(f"[Migration 001_image_file_size] Computed {len(images)} file_size property")
 
 
-def run_migrations(session: Session):
-    _001_image_file_size(session)
-    _002_remove_orphan_image(session)
-    _003_set_admin_for_single_user(session)
+DATA_MIGRATIONS = {
+    "001_image_file_size": _001_image_file_size,
+    "002_remove_orphan_image": _002_remove_orphan_image,
+    "003_set_admin_for_single_user": _003_set_admin_for_single_user,
+}
+
+
+def run_migrations(session: Session, rerun: list[str] | None = None):
+    # Each data migration runs once and is recorded, `rerun` forces the given ones again
+    rerun = set(rerun or [])
+    unknown = rerun - DATA_MIGRATIONS.keys()
+    if unknown:
+        raise ValueError(f"Unknown data migration(s): {', '.join(sorted(unknown))}")
+
+    applied = set(session.exec(select(DataMigration.name)).all())
+    for name, migration in DATA_MIGRATIONS.items():
+        if name in applied and name not in rerun:
+            continue
+
+        migration(session)
+        session.merge(DataMigration(name=name))
+        session.commit()
@@ -0,0 +1,284 @@
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import (Select, delete, event, insert, inspect, select, union,
+                        update)
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from ..models.models import (Category, Place, Trip, TripBooking, TripChange,
+                             TripChecklistItem, TripDay, TripItem,
+                             TripItemAttachmentLink, TripMember,
+                             TripPackingListItem, TripPlaceLink, TripShare,
+                             User)
+from ..utils.cache import get_trip_read_cache
+from ..utils.events import trip_events
+from ..utils.snapshots import get_share_snapshots
+
+# Trip.revision is bumped in the same transaction as any write changing what read_trip returns:
+# rows under the trip (days, items, bookings, packing, checklist, attachments, members, shares)
+# and the places / categories it shows, including their trip count: linking a place to a trip
+# bumps every trip showing it. ORM writes are caught before flush, bulk UPDATE / DELETE
+# statements (e.g. group commit) before they execute.
+# Each bump logs what changed in TripChange, for GET /api/trips/{id}/changes. Once committed, it
+# is pushed to the trip SSE streams (closed when a member or share link is removed, or the trip
+# deleted: access is checked again on reconnect), frees the cached reads of older revisions and removes the
+# share snapshots of the trip, also when a link is revoked or the trip deleted.
+
+# Rows returned by the delta sync, by TripChangesRead list name. Other changes are logged as "trip"
+CHANGE_ENTITIES = {
+    TripDay: "days",
+    TripItem: "items",
+    TripBooking: "bookings",
+    TripPackingListItem: "packing",
+    TripChecklistItem: "checklist",
+}
+CHANGE_LOG_RETENTION = timedelta(days=30)
+# A trip log is pruned once every N revisions
+CHANGE_LOG_PRUNE_EVERY = 100
+
+# (trip id, entity, row id, deleted)
+Change = tuple[int, str, int, bool]
+
+
+def _trip_ids_select(model: type, criteria) -> Select | None:
+    # (row id, trip id) for the `model` rows matching `criteria` and every trip showing them
+    if model is TripItem:
+        return (
+            select(TripItem.id, TripDay.trip_id)
+            .join(TripItem, TripItem.day_id == TripDay.id)
+            .where(criteria)
+        )
+    if model is TripItemAttachmentLink:
+        return (
+            select(TripItemAttachmentLink.item_id, TripDay.trip_id)
+            .join(TripItem, TripItem.day_id == TripDay.id)
+            .join(TripItemAttachmentLink, TripItemAttachmentLink.item_id == TripItem.id)
+            .where(criteria)
+        )
+    if model in (Place, Category):
+        linked = select(Place.id, TripPlaceLink.trip_id).join(Place, Place.id == TripPlaceLink.place_id)
+        in_items = (
+            select(Place.id, TripDay.trip_id)
+            .join(TripItem, TripItem.day_id == TripDay.id)
+            .join(Place, Place.id == TripItem.place_id)
+        )
+        if model is Category:
+            linked = linked.join(Category, Category.id == Place.category_id)
+            in_items = in_items.join(Category, Category.id == Place.category_id)
+        return union(linked.where(criteria), in_items.where(criteria))
+    if model is Trip:
+        return select(Trip.id, Trip.id.label("trip_id")).where(criteria)
+    if "trip_id" in model.__table__.c:
+        return select(model.id, model.trip_id).where(criteria)
+    return None
+
+
+def _change(trip_id: int, model: type, row_id: int, deleted: bool) -> Change:
+    if model is TripItemAttachmentLink:
+        # Item attachments changed, the item itself remains
+        return trip_id, "items", row_id, False
+    if model not in CHANGE_ENTITIES:
+        return trip_id, "trip", trip_id, False
+    return trip_id, CHANGE_ENTITIES[model], row_id, deleted
+
+
+def _stale_share_tokens(session: Session, criteria):
+    # Share links whose snapshot is removed once committed
+    if not get_share_snapshots().enabled:
+        return
+    tokens = session.connection().execute(select(TripShare.token).where(criteria)).scalars()
+    session.info.setdefault("stale_share_tokens", set()).update(tokens)
+
+
+def _bump_and_log(session: Session, changes: set[Change]):
+    if not changes:
+        return
+    connection = session.connection()
+    revisions = dict(
+        connection.execute(
+            update(Trip)
+            .where(Trip.id.in_({trip_id for trip_id, *_ in changes}))
+            .values(revision=Trip.revision + 1)
+            .returning(Trip.id, Trip.revision)
+        ).all()
+    )
+    now = datetime.now(UTC)
+    connection.execute(
+        insert(TripChange),
+        [
+            {
+                "trip_id": trip_id,
+                "revision": revisions[trip_id],
+                "entity": entity,
+                "entity_id": row_id,
+                "deleted": deleted,
+                "created_at": now,
+            }
+            for trip_id, entity, row_id, deleted in changes
+            if trip_id in revisions
+        ],
+    )
+    # Notified after commit: trip id -> (revision, entities)
+    notifications = session.info.setdefault("trip_notifications", {})
+    for trip_id, revision in revisions.items():
+        notifications[trip_id] = (revision, notifications.get(trip_id, (0, set()))[1])
+    for trip_id, entity, *_ in changes:
+        if trip_id in revisions:
+            notifications[trip_id][1].add(entity)
+
+    _stale_share_tokens(session, TripShare.trip_id.in_(revisions))
+
+    for trip_id, revision in revisions.items():
+        if revision % CHANGE_LOG_PRUNE_EVERY == 0:
+            connection.execute(
+                delete(TripChange).where(
+                    TripChange.trip_id == trip_id, TripChange.created_at < now - CHANGE_LOG_RETENTION
+                )
+            )
+
+
+@event.listens_for(Session, "before_flush")
+def collect_flush_changes(session: Session, flush_context, instances):
+    # (trip id, row or None for the trip itself, deleted): ids of new rows are only known after the flush
+    direct: list[tuple[int, object, bool]] = []
+    # Rows whose trip is looked up: (lookup model, lookup id, row, deleted)
+    lookups: list[tuple[type, int, object, bool]] = []
+    # Trip id -> last revision, their cached reads and snapshots are dropped once committed
+    deleted_trips: dict[int, int] = {}
+    # Places linked to or unlinked from a trip: PlaceRead.trip_count changes in every trip showing them
+    relinked: set[int] = set()
+    # Trips losing a member or share link: their event streams are closed once committed
+    revoked: set[int] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        deleted = obj in session.deleted
+        if isinstance(obj, User):
+            # Trips deleted by the database cascade
+            if deleted:
+                trips = select(Trip.id, Trip.revision).where(Trip.user == obj.username)
+                deleted_trips.update(session.connection().execute(trips).all())
+                links = select(TripPlaceLink.place_id).join(Trip).where(Trip.user == obj.username)
+                relinked.update(session.connection().execute(links).scalars())
+                owned = select(Trip.id).where(Trip.user == obj.username)
+                _stale_share_tokens(session, TripShare.trip_id.in_(owned))
+                # Memberships deleted by the database cascade: collaborators change
+                joined = select(TripMember.trip_id).where(TripMember.user == obj.username)
+                for trip_id in session.connection().execute(joined).scalars():
+                    direct.append((trip_id, None, False))
+                    revoked.add(trip_id)
+        elif isinstance(obj, Trip):
+            if deleted:
+                deleted_trips[obj.id] = obj.revision
+                links = select(TripPlaceLink.place_id).where(TripPlaceLink.trip_id == obj.id)
+                relinked.update(session.connection().execute(links).scalars())
+                _stale_share_tokens(session, TripShare.trip_id == obj.id)
+                continue
+            if obj.id is not None:
+                direct.append((obj.id, obj, False))
+            # Not loaded when unchanged
+            added, _, removed = inspect(obj).attrs.places.history
+            relinked.update(place.id for place in (*added, *removed) if place.id is not None)
+        elif isinstance(obj, TripPlaceLink):
+            direct.append((obj.trip_id, None, False))
+            relinked.add(obj.place_id)
+        elif isinstance(obj, TripItem):
+            if obj.day_id is not None:
+                lookups.append((TripDay, obj.day_id, obj, deleted))
+            elif obj.day:
+                direct.append((obj.day.trip_id, obj, deleted))
+        elif isinstance(obj, TripItemAttachmentLink):
+            lookups.append((TripItem, obj.item_id, obj, False))
+        elif isinstance(obj, (Place, Category)):
+            # New ones are not shown by any trip yet
+            if obj not in session.new:
+                lookups.append((type(obj), obj.id, obj, False))
+        elif "trip_id" in obj.__table__.c and obj.trip_id is not None:
+            direct.append((obj.trip_id, obj, deleted))
+            if deleted and isinstance(obj, (TripMember, TripShare)):
+                revoked.add(obj.trip_id)
+            if deleted and isinstance(obj, TripShare) and get_share_snapshots().enabled:
+                # Gone from the database once bumped
+                session.info.setdefault("stale_share_tokens", set()).add(obj.token)
+
+    # Resolved before the flush: deleted rows (and their cascades) are still there
+    ids_by_model: dict[type, set[int]] = {}
+    for model, row_id, *_ in lookups:
+        ids_by_model.setdefault(model, set()).add(row_id)
+    trips_of: dict[tuple[type, int], set[int]] = {}
+    for model, ids in ids_by_model.items():
+        if model is TripDay:
+            stmt = select(TripDay.id, TripDay.trip_id).where(TripDay.id.in_(ids))
+        else:
+            stmt = _trip_ids_select(model, model.id.in_(ids))
+        for row_id, trip_id in session.connection().execute(stmt):
+            trips_of.setdefault((model, row_id), set()).add(trip_id)
+    for model, row_id, obj, deleted in lookups:
+        direct.extend((trip_id, obj, deleted) for trip_id in trips_of.get((model, row_id), ()))
+    if relinked:
+        # No row of these trips changed: logged as a trip change
+        stmt = _trip_ids_select(Place, Place.id.in_(relinked))
+        direct.extend((trip_id, None, False) for _, trip_id in session.connection().execute(stmt))
+
+    if pending := [change for change in direct if change[0] not in deleted_trips]:
+        session.info.setdefault("trip_changes", []).extend(pending)
+    if deleted_trips:
+        session.info.setdefault("deleted_trips", {}).update(deleted_trips)
+    if revoked:
+        session.info.setdefault("revoked_trips", set()).update(revoked)
+
+
+@event.listens_for(Session, "after_flush")
+def log_flush_changes(session: Session, flush_context):
+    changes = set()
+    for trip_id, obj, deleted in session.info.pop("trip_changes", []):
+        if obj is None:
+            changes.add((trip_id, "trip", trip_id, False))
+            continue
+        row_id = obj.item_id if isinstance(obj, TripItemAttachmentLink) else obj.id
+        changes.add(_change(trip_id, type(obj), row_id, deleted))
+    _bump_and_log(session, changes)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def log_bulk_changes(orm_execute_state: ORMExecuteState):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    statement = orm_execute_state.statement
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or statement.whereclause is None:
+        return
+    stmt = _trip_ids_select(mapper.class_, statement.whereclause)
+    if stmt is None:
+        return
+    session = orm_execute_state.session
+    # Bound like the statement itself, i.e. on the writer with RoutingSession
+    connection = session.connection(bind_arguments={"mapper": mapper, "clause": statement})
+    _bump_and_log(
+        session,
+        {
+            _change(trip_id, mapper.class_, row_id, orm_execute_state.is_delete)
+            for row_id, trip_id in connection.execute(stmt)
+        },
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def notify_trip_changes(session: Session):
+    revoked = session.info.pop("revoked_trips", set())
+    for trip_id, (revision, entities) in session.info.pop("trip_notifications", {}).items():
+        get_trip_read_cache().invalidate(trip_id, revision)
+        trip_events.publish(trip_id, revision, sorted(entities), close=trip_id in revoked)
+    for trip_id, revision in session.info.pop("deleted_trips", {}).items():
+        get_trip_read_cache().invalidate(trip_id, revision + 1)
+        trip_events.publish_deleted(trip_id, revision + 1)
+    if tokens := session.info.pop("stale_share_tokens", None):
+        get_share_snapshots().discard(tokens)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_trip_changes(session: Session):
+    session.info.pop("trip_changes", None)
+    session.info.pop("trip_notifications", None)
+    session.info.pop("deleted_trips", None)
+    session.info.pop("stale_share_tokens", None)
+    session.info.pop("revoked_trips", None)
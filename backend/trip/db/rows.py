@@ -0,0 +1,91 @@
+from collections.abc import Iterator
+
+from sqlalchemy import RowMapping, Select, null
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, func, select
+
+from ..models.models import Category, Image, Place, TripPlaceLink
+from .core import RoutingSession
+
+# Read-only Core selects for the list endpoints: plain rows, no ORM entity, identity map
+# or relationship loading. Returned as mappings, key lookup is much cheaper than Row attributes.
+
+CategoryImage = aliased(Image)
+
+# Rows fetched per round trip when streaming (server-side cursor on PostgreSQL)
+STREAM_BATCH_SIZE = 500
+
+
+def category_rows(session: Session, username: str) -> list[RowMapping]:
+    return session.exec(
+        select(
+            Category.id,
+            Category.name,
+            Category.color,
+            Category.image_id,
+            Image.filename.label("image_filename"),
+        )
+        .outerjoin(Image, Image.id == Category.image_id)
+        .where(Category.user == username)
+    ).mappings().all()
+
+
+def _place_select(username: str, deferred: set[str]) -> Select:
+    # deferred: large text columns not returned (sparse fieldset), read as NULL
+    return (
+        select(
+            Place.id,
+            Place.user,
+            Place.name,
+            Place.lat,
+            Place.lng,
+            Place.place,
+            Place.category_id,
+            # A place may use a category that is not in the user's (category_rows)
+            Category.name.label("category_name"),
+            Category.color.label("category_color"),
+            Category.image_id.label("category_image_id"),
+            CategoryImage.filename.label("category_image_filename"),
+            Place.allowdog,
+            null().label("description") if "description" in deferred else Place.description,
+            Place.price,
+            Place.duration,
+            Place.visited,
+            Place.favorite,
+            Place.restroom,
+            Place.links,
+            Place.image_id,
+            Image.filename.label("image_filename"),
+            # List views only flag GPX presence, the track itself is not read
+            (func.coalesce(func.length(Place.gpx), 0) > 0).label("has_gpx"),
+        )
+        .join(Category, Category.id == Place.category_id)
+        .outerjoin(Image, Image.id == Place.image_id)
+        .outerjoin(CategoryImage, CategoryImage.id == Category.image_id)
+        .where(Place.user == username)
+    )
+
+
+def place_rows(session: Session, username: str, deferred: set[str] = frozenset()) -> list[RowMapping]:
+    return session.exec(_place_select(username, deferred)).mappings().all()
+
+
+def iter_place_rows(username: str, deferred: set[str] = frozenset()) -> Iterator[RowMapping]:
+    # Consumed while the response streams, with its own session: the caller closes the request one,
+    # which would otherwise hold a second connection until the stream ends.
+    # Trip count comes with the row so nothing is accumulated per place.
+    trip_count = (
+        select(func.count())
+        .where(TripPlaceLink.place_id == Place.id)
+        .correlate(Place)
+        .scalar_subquery()
+        .label("trip_count")
+    )
+    with RoutingSession() as session:
+        result = session.exec(
+            _place_select(username, deferred)
+            .add_columns(trip_count)
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        for partition in result.mappings().partitions():
+            yield from partition
@@ -4,23 +4,32 @@ import jwt
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .config import get_settings
-from .db.core import get_engine
+from .db.core import RoutingSession, get_async_engine
 from .models.models import User
 
 oauth_password_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
 def get_session():
-    engine = get_engine()
-    with Session(engine) as session:
+    with RoutingSession() as session:
         yield session
 
 
 SessionDep = Annotated[Session, Depends(get_session)]
 
 
+async def get_async_session():
+    engine = get_async_engine()
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+
+
 def get_current_username(token: Annotated[str, Depends(oauth_password_scheme)], session: SessionDep) -> str:
     try:
         payload = jwt.decode(token, get_settings().SECRET_KEY, algorithms=[get_settings().ALGORITHM])
@@ -33,7 +42,11 @@ def get_current_username(token: Annotated[str, Depends(oauth_password_scheme)],
     user = session.get(User, username)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid Token")
-    return user.username
+    username = user.username
+    # Back to the pool until the route queries: async routes would otherwise hold it while
+    # they await, and threads waiting for a connection would starve the ones holding one
+    session.close()
+    return username
 
 
 def require_admin(session: SessionDep, current_user: Annotated[str, Depends(get_current_username)]) -> str:
@@ -9,9 +9,13 @@ from starlette.middleware.gzip import GZipMiddleware
 
 from . import __version__
 from .config import ensure_secret_key, get_settings, migrate_config_file
-from .db.core import init_and_migrate_db
+from .db.core import dispose_async_engine, init_and_migrate_db
+from .db.group_commit import stop_group_committer
+from .db.maintenance import start_maintenance, stop_maintenance
 from .routers import (admin, auth, bookings, categories, places, providers,
                       settings, token, trips)
+from .utils.events import trip_events
+from .utils.snapshots import get_share_snapshots
 from .utils.utils import silence_http_logging
 
 migrate_config_file()
@@ -28,7 +32,14 @@ async def lifespan(app: FastAPI):
     ensure_secret_key()
     await init_and_migrate_db()
     silence_http_logging()
+    start_maintenance()
+    trip_events.start()
+    get_share_snapshots().start()
     yield
+    get_share_snapshots().stop()
+    await stop_maintenance()
+    stop_group_committer()
+    await dispose_async_engine()
 
 
 app = FastAPI(lifespan=lifespan)
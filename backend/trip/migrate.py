@@ -0,0 +1,37 @@
+"""
+Standalone migration, run once before starting (or scaling) API workers:
+    python -m trip.migrate
+Data migrations run once, force one again with:
+    python -m trip.migrate --rerun 002_remove_orphan_image
+"""
+
+import argparse
+import logging
+
+from .config import ensure_secret_key, migrate_config_file
+from .db.core import migrate_db
+from .db.migrations import DATA_MIGRATIONS
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m trip.migrate")
+    parser.add_argument(
+        "--rerun",
+        action="append",
+        choices=list(DATA_MIGRATIONS),
+        default=[],
+        help="run this data migration again, even if already applied (repeatable)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    migrate_config_file()
+    ensure_secret_key()
+    migrate_db(rerun=args.rerun)
+    logger.info("[MIGRATE] Database migrated")
+
+
+if __name__ == "__main__":
+    main()
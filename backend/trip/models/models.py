@@ -1,11 +1,12 @@
 import re
+from base64 import b64encode
 from datetime import UTC, date, datetime
 from enum import Enum
 from types import SimpleNamespace
 from typing import Annotated
 
 from pydantic import BaseModel, StringConstraints, field_validator
-from sqlalchemy import JSON, Column, Index, MetaData, UniqueConstraint, event, select
+from sqlalchemy import JSON, Column, Index, MetaData, UniqueConstraint, event, inspect, select
 from sqlalchemy.orm import Session, object_session
 from sqlmodel import Field, Relationship, SQLModel
 
@@ -48,6 +49,15 @@ def _prefix_assets_url(filename: str) -> str:
     return base + filename
 
 
+def _column_value(obj: SQLModel, key: str):
+    # Column deferred by the query (sparse fieldset): left out, not lazy loaded row by row
+    if key not in obj.__dict__:
+        state = inspect(obj)
+        if key in state.unloaded and key not in state.expired_attributes:
+            return None
+    return getattr(obj, key)
+
+
 class TripItemStatusEnum(str, Enum):
     PENDING = "pending"
     CONFIRMED = "booked"
@@ -243,7 +253,7 @@ class BackupBase(SQLModel):
     filename: str | None = None
     error_message: str | None = None
     file_size: int | None = None
-    full: bool = False
+    full: bool = Field(default=False, nullable=True)
 
 
 class Backup(BackupBase, table=True):
@@ -263,6 +273,29 @@ def mark_backup_for_deletion(mapper, connection, target: Backup):
     session._backups_to_delete.append(target.filename)
 
 
+class DataMigration(SQLModel, table=True):
+    name: str = Field(primary_key=True)
+    applied_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+
+class DbMaintenanceBase(SQLModel):
+    started_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    duration_ms: int = 0
+    bytes_reclaimed: int = 0
+    vacuumed: bool = False
+
+
+class DbMaintenance(DbMaintenanceBase, table=True):
+    id: int | None = Field(default=None, primary_key=True)
+
+
+class DatabaseRead(BaseModel):
+    backend: str
+    pragmas: dict[str, int | str] = {}
+    mismatches: list[str] = []
+    maintenance: list[DbMaintenanceBase] = []
+
+
 class BackupRead(BackupBase):
     id: int
     created_at: datetime
@@ -289,12 +322,17 @@ class UserBase(SQLModel):
     currency: str = get_settings().DEFAULT_CURRENCY
     do_not_display: str = ""
     tile_layer: str | None = None
-    mode_low_network: bool | None = True
-    mode_dark: bool | None = False
-    mode_gpx_in_place: bool | None = False
+    # Server defaults and nullability as created by the migrations (db.core creates new databases from them)
+    mode_low_network: bool | None = Field(
+        default=True, nullable=False, sa_column_kwargs={"server_default": "1"}
+    )
+    mode_dark: bool | None = Field(default=False, nullable=False, sa_column_kwargs={"server_default": "0"})
+    mode_gpx_in_place: bool | None = Field(
+        default=False, nullable=False, sa_column_kwargs={"server_default": "0"}
+    )
     mode_display_visited: bool | None = False
     mode_map_position: bool | None = False
-    show_dog_tag: bool | None = True
+    show_dog_tag: bool | None = Field(default=True, nullable=False, sa_column_kwargs={"server_default": "1"})
     api_token: str | None = None
     duplicate_dist: int | None = None
     language: str | None = None
@@ -303,11 +341,13 @@ class UserBase(SQLModel):
 class User(UserBase, table=True):
     username: str = Field(primary_key=True)
     password: str
-    totp_enabled: bool = False
+    totp_enabled: bool = Field(default=False, sa_column_kwargs={"server_default": "0"})
     totp_secret: str | None = None
     google_apikey: str | None = None
-    map_provider: MapProvider = Field(default=MapProvider.OPENSTREETMAP)
-    is_admin: bool = False
+    map_provider: MapProvider = Field(
+        default=MapProvider.OPENSTREETMAP, sa_column_kwargs={"server_default": "OPENSTREETMAP"}
+    )
+    is_admin: bool = Field(default=False, nullable=True)
 
 
 @event.listens_for(User, "before_delete")
@@ -462,6 +502,18 @@ class CategoryRead(CategoryBase):
             color=obj.color if obj.color else "#000000",
         )
 
+    @classmethod
+    def from_row(cls, row, prefix: str = "") -> "CategoryRead":
+        # row: db.rows.category_rows, or db.rows.place_rows with prefix="category_"
+        filename = row[f"{prefix}image_filename"]
+        return cls(
+            id=row[f"{prefix}id"],
+            name=row[f"{prefix}name"],
+            image_id=row[f"{prefix}image_id"],
+            image=_prefix_assets_url(filename) if filename else "/favicon.png",
+            color=row[f"{prefix}color"] if row[f"{prefix}color"] else "#000000",
+        )
+
 
 class TripPlaceLink(SQLModel, table=True):
     trip_id: int = Field(foreign_key="trip.id", primary_key=True, ondelete="CASCADE")
@@ -531,7 +583,7 @@ class PlaceRead(PlaceBase):
     trip_count: int = 0
 
     @classmethod
-    def serialize(cls, obj: Place, exclude_gpx=True) -> "PlaceRead":
+    def serialize(cls, obj: Place, exclude_gpx=True, trip_count: int | None = None) -> "PlaceRead":
         return cls(
             id=obj.id,
             user=obj.user,
@@ -541,19 +593,82 @@ class PlaceRead(PlaceBase):
             place=obj.place,
             category=CategoryRead.serialize(obj.category),
             allowdog=obj.allowdog,
-            description=obj.description,
+            description=_column_value(obj, "description"),
             price=obj.price,
             duration=obj.duration,
             visited=obj.visited,
             image=_prefix_assets_url(obj.image.filename) if obj.image else None,
             image_id=obj.image_id,
             favorite=obj.favorite,
-            gpx=("1" if obj.gpx else None)
+            gpx=("1" if _column_value(obj, "gpx") else None)
             if exclude_gpx
-            else obj.gpx,  # Generic PlaceRead. Avoid large resp.
+            else _column_value(obj, "gpx"),  # Generic PlaceRead. Avoid large resp.
             restroom=obj.restroom,
             links=obj.links,
-            trip_count=len(obj.trips),
+            trip_count=len(obj.trips) if trip_count is None else trip_count,
+        )
+
+    @classmethod
+    def from_row(cls, row, category: CategoryRead, trip_count: int = 0) -> "PlaceRead":
+        # row: db.rows.place_rows
+        return cls(
+            id=row["id"],
+            user=row["user"],
+            name=row["name"],
+            lat=row["lat"],
+            lng=row["lng"],
+            place=row["place"],
+            category=category,
+            allowdog=row["allowdog"],
+            description=row["description"],
+            price=row["price"],
+            duration=row["duration"],
+            visited=row["visited"],
+            image=_prefix_assets_url(row["image_filename"]) if row["image_filename"] else None,
+            image_id=row["image_id"],
+            favorite=row["favorite"],
+            gpx="1" if row["has_gpx"] else None,
+            restroom=row["restroom"],
+            links=row["links"],
+            trip_count=trip_count,
+        )
+
+
+def _place_read(place: Place, trip_counts: dict[int, int] | None) -> PlaceRead:
+    # trip_counts: place id -> linked trips, counted at once for a whole trip read (Place.trips otherwise)
+    trip_count = None if trip_counts is None else trip_counts.get(place.id, 0)
+    return PlaceRead.serialize(place, trip_count=trip_count)
+
+
+class PlacesColumnarRead(BaseModel):
+    # GET /api/places?format=columnar: parallel arrays, index i is the same place in each.
+    # flags: base64 bitsets, bit i (byte i // 8, LSB first) set when the place has the flag
+    categories: dict[int, CategoryRead]
+    id: list[int]
+    lat: list[float]
+    lng: list[float]
+    name: list[str]
+    category_id: list[int]
+    flags: dict[str, str]
+
+    @classmethod
+    def from_rows(cls, rows, categories: dict[int, CategoryRead]) -> "PlacesColumnarRead":
+        # rows: db.rows.place_rows
+        flag_columns = {"visited": "visited", "favorite": "favorite", "allowdog": "allowdog", "gpx": "has_gpx"}
+        bitsets = {flag: bytearray((len(rows) + 7) // 8) for flag in flag_columns}
+        for i, row in enumerate(rows):
+            for flag, column in flag_columns.items():
+                if row[column]:
+                    bitsets[flag][i // 8] |= 1 << (i % 8)
+
+        return cls(
+            categories=categories,
+            id=[row["id"] for row in rows],
+            lat=[row["lat"] for row in rows],
+            lng=[row["lng"] for row in rows],
+            name=[row["name"] for row in rows],
+            category_id=[row["category_id"] for row in rows],
+            flags={flag: b64encode(bits).decode() for flag, bits in bitsets.items()},
         )
 
 
@@ -566,9 +681,14 @@ class TripBase(SQLModel):
 
 
 class Trip(TripBase, table=True):
+    # AUTOINCREMENT: SQLite would give a deleted trip id to a new trip, matching its ETags and change cursors
+    __table_args__ = {"sqlite_autoincrement": True}
+
     id: int | None = Field(default=None, primary_key=True)
     user: str = Field(foreign_key="user.username", ondelete="CASCADE", index=True)
     image_id: int | None = Field(default=None, foreign_key="image.id", ondelete="CASCADE")
+    # Bumped by every write under the trip (db.revisions), served as the trip ETag
+    revision: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
     image: Image | None = Relationship(back_populates="trips")
     places: list["Place"] = Relationship(
@@ -618,6 +738,33 @@ class TripReadBase(TripBase):
         )
 
 
+class TripSummaryRead(TripReadBase):
+    start_date: date | None
+    end_date: date | None
+    place_count: int
+    item_count: int
+    total_price: float
+
+    @classmethod
+    def from_row(cls, row, memberships: list["TripMember"]) -> "TripSummaryRead":
+        # row: trips list aggregate query, see trips.read_trips
+        return cls(
+            id=row.id,
+            name=row.name,
+            archived=row.archived,
+            image=_prefix_assets_url(row.image_filename) if row.image_filename else None,
+            image_id=row.image_id,
+            days=row.days,
+            collaborators=[TripMemberRead.serialize(m) for m in memberships],
+            currency=row.currency if row.currency else get_settings().DEFAULT_CURRENCY,
+            start_date=row.start_date,
+            end_date=row.end_date,
+            place_count=row.place_count,
+            item_count=row.item_count,
+            total_price=row.total_price,
+        )
+
+
 class TripRead(TripBase):
     id: int
     image: str | None
@@ -627,23 +774,26 @@ class TripRead(TripBase):
     collaborators: list["TripMemberRead"]
     shared: bool
     attachments: list["TripAttachmentRead"]
+    # Starting point of GET /api/trips/{id}/changes?since=
+    revision: int = 0
 
     @classmethod
-    def serialize(cls, obj: Trip) -> "TripRead":
+    def serialize(cls, obj: Trip, trip_counts: dict[int, int] | None = None) -> "TripRead":
         return cls(
             id=obj.id,
             name=obj.name,
             archived=obj.archived,
             image=_prefix_assets_url(obj.image.filename) if obj.image else None,
             image_id=obj.image_id,
-            days=[TripDayRead.serialize(day) for day in obj.days],
-            places=[PlaceRead.serialize(place) for place in obj.places],
+            days=[TripDayRead.serialize(day, trip_counts) for day in obj.days],
+            places=[_place_read(place, trip_counts) for place in obj.places],
             collaborators=[TripMemberRead.serialize(m) for m in obj.memberships],
             shared=bool(obj.shares),
             currency=obj.currency if obj.currency else get_settings().DEFAULT_CURRENCY,
-            notes=obj.notes,
+            notes=_column_value(obj, "notes"),
             archival_review=obj.archival_review,
             attachments=[TripAttachmentRead.serialize(att) for att in obj.attachments],
+            revision=obj.revision,
         )
 
 
@@ -704,7 +854,9 @@ class TripDay(TripDayBase, table=True):
 
 
 class TripBookingBase(SQLModel):
-    type: BookingTypeEnum = BookingTypeEnum.generic
+    type: BookingTypeEnum = Field(
+        default=BookingTypeEnum.generic, sa_column_kwargs={"server_default": "generic"}
+    )
     label: str
     reference: str | None = None
     notes: str | None = None
@@ -735,12 +887,12 @@ class TripDayRead(TripDayBase):
     bookings: list[TripBookingRead]
 
     @classmethod
-    def serialize(cls, obj: TripDay) -> "TripDayRead":
+    def serialize(cls, obj: TripDay, trip_counts: dict[int, int] | None = None) -> "TripDayRead":
         return cls(
             id=obj.id,
             dt=obj.dt,
             label=obj.label,
-            items=[TripItemRead.serialize(item) for item in obj.items],
+            items=[TripItemRead.serialize(item, trip_counts) for item in obj.items],
             bookings=[TripBookingRead.model_validate(b) for b in obj.bookings],
             notes=obj.notes,
         )
@@ -824,7 +976,7 @@ class TripItemRead(TripItemBase):
     attachments: list["TripAttachmentRead"]
 
     @classmethod
-    def serialize(cls, obj: TripItem) -> "TripItemRead":
+    def serialize(cls, obj: TripItem, trip_counts: dict[int, int] | None = None) -> "TripItemRead":
         return cls(
             id=obj.id,
             time=obj.time,
@@ -835,10 +987,10 @@ class TripItemRead(TripItemBase):
             price=obj.price,
             day_id=obj.day_id,
             status=obj.status,
-            place=PlaceRead.serialize(obj.place) if obj.place else None,
+            place=_place_read(obj.place, trip_counts) if obj.place else None,
             image=_prefix_assets_url(obj.image.filename) if obj.image else None,
             image_id=obj.image_id,
-            gpx=obj.gpx,
+            gpx=_column_value(obj, "gpx"),
             paid_by=obj.paid_by,
             links=obj.links,
             attachments=[TripAttachmentRead.serialize(att) for att in obj.attachments],
@@ -873,7 +1025,7 @@ class TripShareItemRead(TripItemBase):
     paid_by: str | None
 
     @classmethod
-    def serialize(cls, obj: TripItem) -> "TripShareItemRead":
+    def serialize(cls, obj: TripItem, trip_counts: dict[int, int] | None = None) -> "TripShareItemRead":
         return cls(
             id=obj.id,
             time=obj.time,
@@ -884,7 +1036,7 @@ class TripShareItemRead(TripItemBase):
             price=obj.price,
             day_id=obj.day_id,
             status=obj.status,
-            place=PlaceRead.serialize(obj.place) if obj.place else None,
+            place=_place_read(obj.place, trip_counts) if obj.place else None,
             image=None,
             image_id=None,
             gpx=obj.gpx,
@@ -899,12 +1051,12 @@ class TripShareDayRead(TripDayBase):
     bookings: list[TripBookingRead]
 
     @classmethod
-    def serialize(cls, obj: TripDay) -> "TripShareDayRead":
+    def serialize(cls, obj: TripDay, trip_counts: dict[int, int] | None = None) -> "TripShareDayRead":
         return cls(
             id=obj.id,
             dt=obj.dt,
             label=obj.label,
-            items=[TripShareItemRead.serialize(item) for item in obj.items],
+            items=[TripShareItemRead.serialize(item, trip_counts) for item in obj.items],
             bookings=[TripBookingRead.model_validate(b) for b in obj.bookings],
             notes=obj.notes,
         )
@@ -918,15 +1070,15 @@ class TripShareRead(TripBase):
     places: list["PlaceRead"]
 
     @classmethod
-    def serialize(cls, obj: Trip) -> "TripShareRead":
+    def serialize(cls, obj: Trip, trip_counts: dict[int, int] | None = None) -> "TripShareRead":
         return cls(
             id=obj.id,
             name=obj.name,
             archived=obj.archived,
             image=_prefix_assets_url(obj.image.filename) if obj.image else None,
             image_id=obj.image_id,
-            days=[TripShareDayRead.serialize(day) for day in obj.days],
-            places=[PlaceRead.serialize(place) for place in obj.places],
+            days=[TripShareDayRead.serialize(day, trip_counts) for day in obj.days],
+            places=[_place_read(place, trip_counts) for place in obj.places],
             currency=obj.currency if obj.currency else get_settings().DEFAULT_CURRENCY,
         )
 
@@ -1039,4 +1191,40 @@ class TripAttachmentRead(TripAttachmentBase):
             file_size=obj.file_size,
             uploaded_by=obj.uploaded_by,
             stored_filename=obj.stored_filename,
-        )
\ No newline at end of file
+        )
+
+
+class TripChange(SQLModel, table=True):
+    # Change log behind GET /api/trips/{id}/changes, written with each revision bump (db.revisions)
+    id: int | None = Field(default=None, primary_key=True)
+    trip_id: int = Field(foreign_key="trip.id", ondelete="CASCADE")
+    revision: int
+    # TripChangesRead list name, "trip" for a change outside the delta
+    entity: str
+    entity_id: int
+    deleted: bool = False
+    created_at: datetime
+
+    __table_args__ = (Index("idx_tripchange_trip_revision", "trip_id", "revision"),)
+
+
+class TripDayChangeRead(TripDayBase):
+    id: int
+
+
+class TripBookingChangeRead(TripBookingRead):
+    day_id: int
+
+
+class TripChangesRead(BaseModel):
+    # revision: pass as the next ?since=. reset: the delta does not cover every change
+    # (trip fields, places, members, attachments, or a pruned log), re-read the trip
+    revision: int
+    reset: bool = False
+    days: list[TripDayChangeRead] = []
+    items: list[TripItemRead] = []
+    bookings: list[TripBookingChangeRead] = []
+    packing: list[TripPackingListItemRead] = []
+    checklist: list[TripChecklistItemRead] = []
+    # Tombstones, ids per list name
+    deleted: dict[str, list[int]] = {}
\ No newline at end of file
@@ -6,10 +6,14 @@ from fastapi.responses import FileResponse
 from sqlmodel import func, select
 
 from ..config import get_settings, update_config
+from ..db.core import (get_database_url, get_read_engine, is_sqlite,
+                       read_sqlite_pragmas, sqlite_pragma_mismatches)
+from ..db.maintenance import run_maintenance
 from ..deps import SessionDep, require_admin
 from ..models.models import (AdminUserRead, Backup, BackupRead, BackupStatus,
-                             ConfigRead, ConfigUpdate, Image, MagicLink,
-                             MagicLinkRead, Place, TempPasswordRead,
+                             ConfigRead, ConfigUpdate, DatabaseRead,
+                             DbMaintenance, DbMaintenanceBase, Image,
+                             MagicLink, MagicLinkRead, Place, TempPasswordRead,
                              TripAttachment, User)
 from ..security import hash_password
 from ..utils.date import dt_utc, dt_utc_offset
@@ -53,7 +57,9 @@ def _get_quotas(session: SessionDep) -> tuple[dict[str, int], dict[str, int]]:
 
 @router.get("/users", response_model=list[AdminUserRead])
 def read_users(session: SessionDep) -> list[AdminUserRead]:
-    users = session.exec(select(User)).all()
+    users = session.exec(
+        select(User.username, User.totp_enabled, User.google_apikey, User.api_token, User.is_admin)
+    ).all()
     places_user_map, storage_user_map = _get_quotas(session)
     return [
         AdminUserRead.serialize(
@@ -156,6 +162,31 @@ def update_server_config(config_update: ConfigUpdate, session: SessionDep) -> Co
     return ConfigRead(**new_settings.model_dump())
 
 
+@router.get("/database", response_model=DatabaseRead)
+def read_database_profile(session: SessionDep) -> DatabaseRead:
+    if not is_sqlite():
+        return DatabaseRead(backend=get_database_url().get_backend_name())
+
+    pragmas = read_sqlite_pragmas(get_read_engine())
+    db_maintenance = session.exec(select(DbMaintenance).order_by(DbMaintenance.id.desc()).limit(10)).all()
+    return DatabaseRead(
+        backend="sqlite",
+        pragmas=pragmas,
+        mismatches=sqlite_pragma_mismatches(pragmas),
+        maintenance=db_maintenance,
+    )
+
+
+@router.post("/database/maintenance", response_model=DbMaintenanceBase)
+def run_database_maintenance() -> DbMaintenanceBase:
+    if not is_sqlite():
+        raise HTTPException(status_code=400, detail="Maintenance is handled by PostgreSQL")
+
+    if not (db_maintenance := run_maintenance()):
+        raise HTTPException(status_code=409, detail="Maintenance is already running")
+    return db_maintenance
+
+
 @router.post("/backups", response_model=BackupRead)
 def create_admin_backup(
     background_tasks: BackgroundTasks,
@@ -5,10 +5,12 @@ from sqlalchemy.orm import selectinload
 from sqlmodel import select
 
 from ..config import get_settings
+from ..db.rows import category_rows
 from ..deps import SessionDep, get_current_username
 from ..models.models import (Category, CategoryCreate, CategoryRead,
                              CategoryUpdate, Image, Place)
 from ..security import verify_exists_and_owns
+from ..utils.responses import ModelResponse
 from ..utils.utils import b64img_decode, remove_image, save_image_to_file
 
 router = APIRouter(prefix="/api/categories", tags=["categories"])
@@ -18,10 +20,7 @@ router = APIRouter(prefix="/api/categories", tags=["categories"])
 def read_categories(
     session: SessionDep, current_user: Annotated[str, Depends(get_current_username)]
 ) -> list[CategoryRead]:
-    db_categories = session.exec(
-        select(Category).options(selectinload(Category.image)).where(Category.user == current_user)
-    ).all()
-    return [CategoryRead.serialize(category) for category in db_categories]
+    return ModelResponse([CategoryRead.from_row(row) for row in category_rows(session, current_user)])
 
 
 @router.post("", response_model=CategoryRead)
@@ -1,34 +1,148 @@
-from typing import Annotated
+import asyncio
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import selectinload
-from sqlmodel import select
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import update
+from sqlalchemy.orm import defer, selectinload
+from sqlmodel import func, select
 
 from ..config import get_settings
-from ..deps import SessionDep, get_current_username
-from ..models.models import Image, Place, PlaceCreate, PlaceRead, PlaceUpdate
+from ..db.core import RoutingSession
+from ..db.group_commit import get_group_committer
+from ..db.rows import category_rows, iter_place_rows, place_rows
+from ..deps import AsyncSessionDep, SessionDep, get_current_username
+from ..models.models import (Category, CategoryRead, Image, Place, PlaceCreate,
+                             PlaceRead, PlacesColumnarRead, PlaceUpdate,
+                             TripPlaceLink)
 from ..security import verify_exists_and_owns
+from ..utils.fieldsets import Fieldset, fieldset_of
+from ..utils.responses import (STREAM_RESPONSES, ModelResponse, model_response,
+                               stream_response, wants_ndjson)
 from ..utils.utils import (b64img_decode, download_file, patch_image,
                            remove_image, save_image_to_file)
 
 router = APIRouter(prefix="/api/places", tags=["places"])
 
+# Flags toggled one by one from the map, eligible to group commit
+PLACE_FLAGS = {"visited", "favorite"}
 
-@router.get("", response_model=list[PlaceRead])
-def read_places(
-    session: SessionDep, current_user: Annotated[str, Depends(get_current_username)]
-) -> list[PlaceRead]:
-    db_places = session.exec(
+
+async def _get_place_for_read(session: AsyncSessionDep, place_id: int) -> Place | None:
+    # AsyncSession cannot lazy load, PlaceRead relations are loaded upfront
+    result = await session.exec(
         select(Place)
-        .options(selectinload(Place.image), selectinload(Place.category), selectinload(Place.trips))
-        .where(Place.user == current_user)
-    ).all()
-    return [PlaceRead.serialize(p) for p in db_places]
+        .options(
+            selectinload(Place.image),
+            selectinload(Place.category).selectinload(Category.image),
+            selectinload(Place.trips),
+        )
+        .where(Place.id == place_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.first()
+
+
+def save_new_place(new_place: Place, image: Image | None) -> int:
+    # Async routes write through the single writer like the sync ones (run in a thread),
+    # their AsyncSession only reads
+    with RoutingSession() as session:
+        if image:
+            session.add(image)
+            session.flush()
+            new_place.image_id = image.id
+        session.add(new_place)
+        session.flush()
+        # Read before the commit expires it, a refresh would take a second connection
+        place_id = new_place.id
+        session.commit()
+        return place_id
+
+
+def _save_place_update(place_id: int, place_data: dict, image: Image | None):
+    with RoutingSession() as session:
+        db_place = session.get(Place, place_id)
+        if image:
+            session.add(image)
+            session.flush()
+            if db_place.image_id:
+                old_image = session.get(Image, db_place.image_id)
+                try:
+                    session.delete(old_image)
+                    db_place.image_id = None
+                    session.refresh(db_place)
+                except Exception:
+                    raise HTTPException(status_code=400, detail="Bad request")
+            db_place.image_id = image.id
+
+        for key, value in place_data.items():
+            setattr(db_place, key, value)
+        session.add(db_place)
+        session.commit()
+
+
+def _place_category(categories: dict[int, CategoryRead], row) -> CategoryRead:
+    # Shared instance per category, the ones not in the user's map come with the row
+    if (category := categories.get(row["category_id"])) is None:
+        category = categories[row["category_id"]] = CategoryRead.from_row(row, prefix="category_")
+    return category
+
+
+@router.get("", response_model=list[PlaceRead] | PlacesColumnarRead, responses=STREAM_RESPONSES)
+def read_places(
+    request: Request,
+    session: SessionDep,
+    current_user: Annotated[str, Depends(get_current_username)],
+    fieldset: Annotated[Fieldset, Depends(fieldset_of(PlaceRead))],
+    format: Literal["columnar"] | None = None,
+    stream: bool = False,
+) -> list[PlaceRead] | PlacesColumnarRead:
+    categories = {row["id"]: CategoryRead.from_row(row) for row in category_rows(session, current_user)}
+    if format == "columnar":
+        # Map view: categories once, no repeated keys
+        places = place_rows(session, current_user, deferred={"description"})
+        for row in places:
+            _place_category(categories, row)
+        return model_response(request, PlacesColumnarRead.from_rows(places, categories))
+
+    # Only large column selected by the list, gpx is read as a has_gpx flag
+    deferred = set() if fieldset.wants("description") else {"description"}
+    if stream or wants_ndjson(request):
+        # Same items as the list, paged from the DB and sent as they are serialized.
+        # The request session would stay open until the stream ends: released first
+        session.close()
+        return stream_response(
+            request,
+            (
+                PlaceRead.from_row(row, _place_category(categories, row), row["trip_count"])
+                for row in iter_place_rows(current_user, deferred)
+            ),
+            fieldset,
+        )
+
+    # Counted in SQL, Place.trips would load every linked Trip row
+    trip_counts = {}
+    if fieldset.wants("trip_count"):
+        trip_counts = dict(
+            session.exec(
+                select(TripPlaceLink.place_id, func.count())
+                .join(Place, Place.id == TripPlaceLink.place_id)
+                .where(Place.user == current_user)
+                .group_by(TripPlaceLink.place_id)
+            ).all()
+        )
+    return model_response(
+        request,
+        [
+            PlaceRead.from_row(row, _place_category(categories, row), trip_counts.get(row["id"], 0))
+            for row in place_rows(session, current_user, deferred)
+        ],
+        fieldset,
+    )
 
 
 @router.post("", response_model=PlaceRead)
 async def create_place(
-    place: PlaceCreate, session: SessionDep, current_user: Annotated[str, Depends(get_current_username)]
+    place: PlaceCreate, session: AsyncSessionDep, current_user: Annotated[str, Depends(get_current_username)]
 ) -> PlaceRead:
     new_place = Place(
         name=place.name,
@@ -47,94 +161,70 @@ async def create_place(
         user=current_user,
     )
 
-    filename = None
+    image, filename = None, None
     if place.image:
         if place.image[:4] == "http":
             fp, file_size = await download_file(place.image)
             if fp:
                 patch_image(fp)
                 image = Image(filename=fp.split("/")[-1], file_size=file_size, user=current_user)
-                session.add(image)
-                session.flush()
-                new_place.image_id = image.id
         else:
             image_bytes = b64img_decode(place.image)
             filename, file_size = save_image_to_file(image_bytes, get_settings().PLACE_IMAGE_SIZE)
             if not filename:
                 raise HTTPException(status_code=400, detail="Bad request")
             image = Image(filename=filename, file_size=file_size, user=current_user)
-            session.add(image)
-            session.flush()
-            new_place.image_id = image.id
 
     try:
-        session.add(new_place)
-        session.commit()
+        place_id = await asyncio.to_thread(save_new_place, new_place, image)
     except Exception:
-        session.rollback()
         if filename:
             remove_image(filename)
         raise HTTPException(status_code=500, detail="Failed to create")
-    return PlaceRead.serialize(new_place)
+    return PlaceRead.serialize(await _get_place_for_read(session, place_id))
 
 
 @router.put("/{place_id}", response_model=PlaceRead)
 async def update_place(
-    session: SessionDep,
+    session: AsyncSessionDep,
     place_id: int,
     place: PlaceUpdate,
     current_user: Annotated[str, Depends(get_current_username)],
 ) -> PlaceRead:
-    db_place = session.get(Place, place_id)
+    db_place = await session.get(Place, place_id)
     verify_exists_and_owns(current_user, db_place)
 
     place_data = place.model_dump(exclude_unset=True)
+    if place_data and place_data.keys() <= PLACE_FLAGS and (committer := get_group_committer()):
+        await asyncio.wrap_future(
+            committer.submit(update(Place).where(Place.id == place_id).values(**place_data))
+        )
+        return PlaceRead.serialize(await _get_place_for_read(session, place_id))
+
     image = place_data.pop("image", None)
-    filename = None
+    new_image, filename = None, None
     if image:
-        image_updated = False
         if image[:4] == "http":
             fp, file_size = await download_file(place.image)
             if fp:
                 patch_image(fp)
-                image = Image(filename=fp.split("/")[-1], file_size=file_size, user=current_user)
-                session.add(image)
-                session.flush()
-                image_updated = True
+                new_image = Image(filename=fp.split("/")[-1], file_size=file_size, user=current_user)
         else:
             image_bytes = b64img_decode(place.image)
             filename, file_size = save_image_to_file(image_bytes, get_settings().PLACE_IMAGE_SIZE)
             if not filename:
                 raise HTTPException(status_code=400, detail="Bad request")
-            image = Image(filename=filename, file_size=file_size, user=current_user)
-            session.add(image)
-            session.flush()
-            session.refresh(db_place)
-            image_updated = True
-
-        if image_updated:
-            if db_place.image_id:
-                old_image = session.get(Image, db_place.image_id)
-                try:
-                    session.delete(old_image)
-                    db_place.image_id = None
-                    session.refresh(db_place)
-                except Exception:
-                    raise HTTPException(status_code=400, detail="Bad request")
-            db_place.image_id = image.id
-
-    for key, value in place_data.items():
-        setattr(db_place, key, value)
+            new_image = Image(filename=filename, file_size=file_size, user=current_user)
 
     try:
-        session.add(db_place)
-        session.commit()
+        await asyncio.to_thread(_save_place_update, place_id, place_data, new_image)
+    except HTTPException:
+        raise
     except Exception:
-        session.rollback()
         if filename:
             remove_image(filename)
         raise HTTPException(status_code=500, detail="Failed to update")
-    return PlaceRead.serialize(db_place)
+    return PlaceRead.serialize(await _get_place_for_read(session, place_id))
 
 
 @router.delete("/{place_id}")
@@ -163,12 +253,15 @@ def get_place(
     session: SessionDep,
     place_id: int,
     current_user: Annotated[str, Depends(get_current_username)],
+    fieldset: Annotated[Fieldset, Depends(fieldset_of(PlaceRead))],
 ) -> PlaceRead:
+    deferred = [defer(column) for column in (Place.gpx, Place.description) if not fieldset.wants(column.key)]
     db_place = session.exec(
         select(Place)
-        .options(selectinload(Place.image), selectinload(Place.category))
+        .options(selectinload(Place.image), selectinload(Place.category), *deferred)
         .where(Place.id == place_id)
     ).first()
     verify_exists_and_owns(current_user, db_place)
 
-    return PlaceRead.serialize(db_place, exclude_gpx=False)
+    trip_count = None if fieldset.wants("trip_count") else 0
+    return ModelResponse(PlaceRead.serialize(db_place, exclude_gpx=False, trip_count=trip_count), fieldset)
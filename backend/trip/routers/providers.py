@@ -4,7 +4,7 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 
-from ..deps import SessionDep, get_current_username
+from ..deps import AsyncSessionDep, get_current_username
 from ..models.models import (LatitudeLongitude, ProviderBoundaries,
                              ProviderPlaceResult, RoutingQuery,
                              RoutingResponse, User)
@@ -19,8 +19,8 @@ router = APIRouter(prefix="/api/completions", tags=["completions"])
 logger = logging.getLogger(__name__)
 
 
-def _get_user(session: SessionDep, current_user: str) -> User:
-    db_user = session.get(User, current_user)
+async def _get_user(session: AsyncSessionDep, current_user: str) -> User:
+    db_user = await session.get(User, current_user)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
@@ -33,8 +33,8 @@ def _raise_missing_apikey(db_user, raise_msg=""):
         )
 
 
-def _get_map_provider(session: SessionDep, current_user: str) -> BaseMapProvider:
-    db_user = _get_user(session, current_user)
+async def _get_map_provider(session: AsyncSessionDep, current_user: str) -> BaseMapProvider:
+    db_user = await _get_user(session, current_user)
     provider_type = getattr(db_user, "map_provider", "osm").lower()
     if provider_type == "google":
         _raise_missing_apikey(db_user)
@@ -75,15 +75,16 @@ async def _process_batch(
 @router.post("/bulk")
 async def bulk_to_places(
     data: list[str],
-    session: SessionDep,
+    session: AsyncSessionDep,
     current_user: Annotated[str, Depends(get_current_username)],
 ) -> list[ProviderPlaceResult]:
-    provider = _get_map_provider(session, current_user)
+    provider = await _get_map_provider(session, current_user)
+    # Resolved once: the AsyncSession must not be used concurrently by the batch
+    db_user = await _get_user(session, current_user)
 
     async def _process_content(content: str, provider: BaseMapProvider) -> ProviderPlaceResult | None:
         try:
             if "google.com/maps" in content:
-                db_user = _get_user(session, current_user)
                 _raise_missing_apikey(db_user, "Google Maps links provided but missing API key")
                 provider = GoogleMapsProvider(api_key=db_user.google_apikey)
                 if result := await provider.url_to_place(content):
@@ -101,13 +102,13 @@ async def bulk_to_places(
 @router.get("/search")
 async def text_search(
     q: str,
-    session: SessionDep,
+    session: AsyncSessionDep,
     current_user: Annotated[str, Depends(get_current_username)],
 ) -> list[ProviderPlaceResult]:
     if not q or not q.strip():
         raise HTTPException(status_code=400, detail="Query required")
 
-    provider = _get_map_provider(session, current_user)
+    provider = await _get_map_provider(session, current_user)
     results = await provider.text_search(q.strip())
 
     if not results:
@@ -125,10 +126,10 @@ async def text_search(
 @router.post("/nearby")
 async def nearby_search(
     data: LatitudeLongitude,
-    session: SessionDep,
+    session: AsyncSessionDep,
     current_user: Annotated[str, Depends(get_current_username)],
 ) -> list[ProviderPlaceResult]:
-    provider = _get_map_provider(session, current_user)
+    provider = await _get_map_provider(session, current_user)
 
     location = {"latitude": data.latitude, "longitude": data.longitude}
     results = await provider.search_nearby(location)
@@ -148,13 +149,13 @@ async def nearby_search(
 @router.get("/geocode")
 async def geocode_search(
     q: str,
-    session: SessionDep,
+    session: AsyncSessionDep,
     current_user: Annotated[str, Depends(get_current_username)],
 ) -> ProviderBoundaries:
     if not q or not q.strip():
         raise HTTPException(status_code=400, detail="Query required")
 
-    provider = _get_map_provider(session, current_user)
+    provider = await _get_map_provider(session, current_user)
     if not (bounds := await provider.geocode(q.strip())):
         raise HTTPException(status_code=404, detail="Location not found")
     return bounds
@@ -163,12 +164,12 @@ async def geocode_search(
 @router.post("/route")
 async def get_route(
     data: RoutingQuery,
-    session: SessionDep,
+    session: AsyncSessionDep,
     current_user: Annotated[str, Depends(get_current_username)],
 ) -> RoutingResponse:
     if len(data.coordinates) < 2:
         raise HTTPException(status_code=400, detail="Coordinates required")
-    provider = _get_map_provider(session, current_user)
+    provider = await _get_map_provider(session, current_user)
     return await provider.get_route(data)
 
 
@@ -176,11 +177,11 @@ async def get_route(
 ## Google-specific
 @router.post("/mymaps-import")
 async def google_mymaps_kmz_import(
-    session: SessionDep,
+    session: AsyncSessionDep,
     current_user: Annotated[str, Depends(get_current_username)],
     file: UploadFile = File(...),
 ) -> list[ProviderPlaceResult]:
-    db_user = _get_user(session, current_user)
+    db_user = await _get_user(session, current_user)
     _raise_missing_apikey(db_user)
     provider = GoogleMapsProvider(api_key=db_user.google_apikey)
 
@@ -209,11 +210,11 @@ async def google_mymaps_kmz_import(
 
 @router.post("/takeout-import")
 async def google_takeout_csv_import(
-    session: SessionDep,
+    session: AsyncSessionDep,
     current_user: Annotated[str, Depends(get_current_username)],
     file: UploadFile = File(...),
 ) -> list[ProviderPlaceResult]:
-    db_user = _get_user(session, current_user)
+    db_user = await _get_user(session, current_user)
     _raise_missing_apikey(db_user)
     provider = GoogleMapsProvider(api_key=db_user.google_apikey)
 
@@ -242,13 +243,13 @@ async def google_takeout_csv_import(
 @router.get("/google/resolve-shortlink/{link_id}")
 async def google_resolve_shortlink(
     link_id: str,
-    session: SessionDep,
+    session: AsyncSessionDep,
     current_user: Annotated[str, Depends(get_current_username)],
 ) -> ProviderPlaceResult:
     if not link_id:
         raise HTTPException(status_code=400, detail="Google ID is missing, resolve failed")
 
-    db_user = _get_user(session, current_user)
+    db_user = await _get_user(session, current_user)
     _raise_missing_apikey(db_user)
     provider = GoogleMapsProvider(api_key=db_user.google_apikey)
     url = await provider._resolve_shortlink(link_id)
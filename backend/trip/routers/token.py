@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import Annotated
 
@@ -5,13 +6,13 @@ from fastapi import APIRouter, Header, HTTPException
 from sqlmodel import select
 
 from ..config import get_settings
-from ..deps import SessionDep
+from ..deps import AsyncSessionDep, SessionDep
 from ..models.models import (Category, CategoryRead, Image, Place, PlaceCreate,
                              PlaceRead, TokenGoogleSearch, TokenPlaceCreate)
-from ..security import api_token_to_user
+from ..security import api_token_to_user, async_api_token_to_user
 from ..utils.utils import (b64img_decode, download_file, patch_image,
                            remove_image, save_image_to_file)
-from .places import create_place
+from .places import _get_place_for_read, create_place, save_new_place
 from .providers import bulk_to_places, google_resolve_shortlink, text_search
 
 router = APIRouter(prefix="/api/by_token", tags=["by_token"])
@@ -23,13 +24,15 @@ logger = logging.getLogger(__name__)
 @router.post("/place", response_model=PlaceRead)
 async def token_create_place(
     place: TokenPlaceCreate,
-    session: SessionDep,
+    session: AsyncSessionDep,
     X_Api_Token: Annotated[str | None, Header()] = None,
 ) -> PlaceRead:
-    db_user = api_token_to_user(session, X_Api_Token)
+    db_user = await async_api_token_to_user(session, X_Api_Token)
     current_user = db_user.username
-    category = session.exec(
-        select(Category).where(Category.user == current_user, Category.name == place.category)
+    category = (
+        await session.exec(
+            select(Category).where(Category.user == current_user, Category.name == place.category)
+        )
     ).first()
     if not category:
         raise HTTPException(status_code=400, detail="Bad Request, unknown Category")
@@ -48,35 +51,27 @@ async def token_create_place(
         user=current_user,
     )
 
-    filename = None
+    image, filename = None, None
     if place.image:
         if place.image[:4] == "http":
             fp, file_size = await download_file(place.image)
             if fp:
                 patch_image(fp)
                 image = Image(filename=fp.split("/")[-1], file_size=file_size, user=current_user)
-                session.add(image)
-                session.flush()
-                new_place.image_id = image.id
         else:
             image_bytes = b64img_decode(place.image)
             filename, file_size = save_image_to_file(image_bytes, get_settings().PLACE_IMAGE_SIZE)
             if not filename:
                 raise HTTPException(status_code=400, detail="Bad request")
             image = Image(filename=filename, file_size=file_size, user=current_user)
-            session.add(image)
-            session.flush()
-            new_place.image_id = image.id
 
     try:
-        session.add(new_place)
-        session.commit()
+        place_id = await asyncio.to_thread(save_new_place, new_place, image)
     except Exception:
-        session.rollback()
         if filename:
             remove_image(filename)
         raise HTTPException(status_code=500, detail="Failed to create")
-    return PlaceRead.serialize(new_place)
+    return PlaceRead.serialize(await _get_place_for_read(session, place_id))
 
 
 @router.get("/categories", response_model=list[CategoryRead])
@@ -90,9 +85,9 @@ def token_read_categories(
 
 @router.post("/google-search")
 async def token_google_search(
-    data: TokenGoogleSearch, session: SessionDep, X_Api_Token: Annotated[str | None, Header()] = None
+    data: TokenGoogleSearch, session: AsyncSessionDep, X_Api_Token: Annotated[str | None, Header()] = None
 ) -> PlaceRead:
-    db_user = api_token_to_user(session, X_Api_Token)
+    db_user = await async_api_token_to_user(session, X_Api_Token)
     current_user = db_user.username
 
     query = data.q
@@ -115,13 +110,17 @@ async def token_google_search(
 
     category = None
     if result.category:
-        category = session.exec(
-            select(Category).where(Category.user == current_user, Category.name == result.category)
+        category = (
+            await session.exec(
+                select(Category).where(Category.user == current_user, Category.name == result.category)
+            )
         ).first()
 
     if not category and data.category:
-        category = session.exec(
-            select(Category).where(Category.user == current_user, Category.name == data.category)
+        category = (
+            await session.exec(
+                select(Category).where(Category.user == current_user, Category.name == data.category)
+            )
         ).first()
 
     if not category:
@@ -1,27 +1,42 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import (APIRouter, Depends, File, HTTPException, Query, Request,
+                     UploadFile)
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from sqlalchemy import update
-from sqlalchemy.orm import selectinload
-from sqlmodel import select
+from sqlalchemy.orm import defer, noload, selectinload
+from sqlmodel import func, select
 
 from ..config import get_settings
+from ..db.core import RoutingSession
+from ..db.group_commit import get_group_committer
 from ..deps import SessionDep, get_current_username
-from ..models.models import (Image, Place, Trip, TripAttachment,
-                             TripAttachmentRead, TripBooking, TripChecklistItem,
+from ..models.models import (Category, Image, Place, Trip, TripAttachment,
+                             TripAttachmentRead, TripBooking,
+                             TripBookingChangeRead, TripChange,
+                             TripChangesRead, TripChecklistItem,
                              TripChecklistItemCreate, TripChecklistItemRead,
                              TripChecklistItemUpdate, TripCreate, TripDay,
-                             TripDayBase, TripDayRead, TripInvitationRead,
-                             TripItem, TripItemCreate, TripItemRead,
-                             TripItemUpdate, TripMember, TripMemberCreate,
-                             TripMemberRead, TripPackingListItem,
-                             TripPackingListItemCreate,
+                             TripDayBase, TripDayChangeRead, TripDayRead,
+                             TripInvitationRead, TripItem, TripItemCreate,
+                             TripItemRead, TripItemUpdate, TripMember,
+                             TripMemberCreate, TripMemberRead,
+                             TripPackingListItem, TripPackingListItemCreate,
                              TripPackingListItemRead,
-                             TripPackingListItemUpdate, TripRead, TripReadBase,
-                             TripShare, TripShareCreate, TripShareDetails,
-                             TripShareRead, TripUpdate, User)
+                             TripPackingListItemUpdate, TripPlaceLink,
+                             TripRead, TripReadBase, TripShare,
+                             TripShareCreate, TripShareDetails, TripShareRead,
+                             TripSummaryRead, TripUpdate, User)
+from ..utils.cache import get_trip_read_cache
 from ..utils.date import dt_utc
+from ..utils.events import SSE_HEADERS, trip_events
+from ..utils.fieldsets import Fieldset, fieldset_of
+from ..utils.responses import (CONDITIONAL_RESPONSES, MSGPACK_RESPONSES,
+                               ModelResponse, cached_model_response,
+                               model_response, not_modified, revision_etag,
+                               wants_msgpack)
+from ..utils.snapshots import (SNAPSHOT_CACHE_CONTROL, Snapshot,
+                               get_share_snapshots)
 from ..utils.utils import (attachments_trip_folder_path, b64img_decode,
                            generate_urlsafe, remove_image, save_attachment,
                            save_image_to_file)
@@ -36,6 +51,23 @@ def _trip_from_token_or_404(session, token: str) -> TripShare:
     return share
 
 
+def _share_revision(session, token: str) -> tuple[int, bool | None, int] | None:
+    # (trip id, full access, current trip revision) in one indexed lookup
+    share = session.exec(
+        select(TripShare.trip_id, TripShare.is_full_access, Trip.revision)
+        .join(Trip, Trip.id == TripShare.trip_id)
+        .where(TripShare.token == token)
+    ).first()
+    return tuple(share) if share else None
+
+
+def _share_revision_or_404(session, token: str) -> tuple[int, bool | None, int]:
+    share = _share_revision(session, token)
+    if not share:
+        raise HTTPException(status_code=404, detail="Not found")
+    return share
+
+
 def _trip_usernames(session, trip_id: int) -> set[str]:
     owner = session.exec(select(Trip.user).where(Trip.id == trip_id)).first()
     members = session.exec(
@@ -44,6 +76,70 @@ def _trip_usernames(session, trip_id: int) -> set[str]:
     return {owner} | set(members)
 
 
+def _trip_read_options(fieldset: Fieldset | None = None) -> tuple:
+    # Everything TripRead / TripShareRead serialize, otherwise lazy loaded per place and per item.
+    # Sparse fieldset: what is not returned is not loaded, relationships skipped and large columns deferred.
+    def wants(path: str) -> bool:
+        return fieldset is None or fieldset.wants(path)
+
+    def load(relationship, path: str, *options):
+        return selectinload(relationship).options(*options) if wants(path) else noload(relationship)
+
+    def deferred(*columns, path: str = "") -> list:
+        return [defer(column) for column in columns if not wants(f"{path}.{column.key}".lstrip("."))]
+
+    def place_options(path: str) -> tuple:
+        return (
+            selectinload(Place.category).selectinload(Category.image),
+            load(Place.image, f"{path}.image"),
+            *deferred(Place.gpx, Place.description, path=path),
+        )
+
+    return (
+        load(
+            Trip.days,
+            "days",
+            load(
+                TripDay.items,
+                "days.items",
+                load(TripItem.place, "days.items.place", *place_options("days.items.place")),
+                load(TripItem.image, "days.items.image"),
+                load(TripItem.attachments, "days.items.attachments"),
+                *deferred(TripItem.gpx, path="days.items"),
+            ),
+            load(TripDay.bookings, "days.bookings"),
+        ),
+        load(Trip.places, "places", *place_options("places")),
+        load(Trip.image, "image"),
+        load(Trip.memberships, "collaborators"),
+        load(Trip.shares, "shared"),
+        load(Trip.attachments, "attachments"),
+        *deferred(Trip.notes),
+    )
+
+
+def _place_trip_counts(session, places: list[Place], fieldset: Fieldset | None = None) -> dict[int, int]:
+    # Trip count of the places shown, counted in SQL as in places.read_places: Place.trips would load
+    # every linked Trip row
+    if fieldset is not None and not (
+        fieldset.wants("places.trip_count") or fieldset.wants("days.items.place.trip_count")
+    ):
+        return {}
+    if not (place_ids := {place.id for place in places}):
+        return {}
+    return dict(
+        session.exec(
+            select(TripPlaceLink.place_id, func.count())
+            .where(TripPlaceLink.place_id.in_(place_ids))
+            .group_by(TripPlaceLink.place_id)
+        ).all()
+    )
+
+
+def _shown_places(trip: Trip) -> list[Place]:
+    return [*trip.places, *(item.place for day in trip.days for item in day.items if item.place)]
+
+
 def _get_verified_trip(session, trip_id: int, username: str) -> Trip:
     # Merge of _verify_trip_member(+_can_access_trip) + _get_trip_or_404
     # Returns a Trip if: it exists and username is a TripMember or trip.user (owner)
@@ -60,20 +156,73 @@ def _get_verified_trip(session, trip_id: int, username: str) -> Trip:
     return trip
 
 
-@router.get("", response_model=list[TripReadBase])
+@router.get("", response_model=list[TripSummaryRead])
 def read_trips(
     session: SessionDep, current_user: Annotated[str, Depends(get_current_username)]
-) -> list[TripReadBase]:
-    trips = session.exec(
-        select(Trip)
-        .join(TripMember, isouter=True)
-        .where(
-            (Trip.user == current_user)
-            | ((TripMember.user == current_user) & (TripMember.joined_at.is_not(None)))
+) -> list[TripSummaryRead]:
+    joined_trip_ids = select(TripMember.trip_id).where(
+        TripMember.user == current_user, TripMember.joined_at.is_not(None)
+    )
+    trip_ids = select(Trip.id).where((Trip.user == current_user) | Trip.id.in_(joined_trip_ids))
+
+    # Aggregated per trip before joining, joining days, items and places directly would multiply rows
+    day_stats = (
+        select(
+            TripDay.trip_id,
+            func.count(TripDay.id).label("days"),
+            func.min(TripDay.dt).label("start_date"),
+            func.max(TripDay.dt).label("end_date"),
+        )
+        .where(TripDay.trip_id.in_(trip_ids))
+        .group_by(TripDay.trip_id)
+        .subquery()
+    )
+    item_stats = (
+        select(
+            TripDay.trip_id,
+            func.count(TripItem.id).label("item_count"),
+            func.sum(TripItem.price).label("total_price"),
         )
-        .distinct()
+        .join(TripItem, TripItem.day_id == TripDay.id)
+        .where(TripDay.trip_id.in_(trip_ids))
+        .group_by(TripDay.trip_id)
+        .subquery()
     )
-    return [TripReadBase.serialize(trip) for trip in trips]
+    place_stats = (
+        select(TripPlaceLink.trip_id, func.count().label("place_count"))
+        .where(TripPlaceLink.trip_id.in_(trip_ids))
+        .group_by(TripPlaceLink.trip_id)
+        .subquery()
+    )
+
+    rows = session.exec(
+        select(
+            Trip.id,
+            Trip.name,
+            Trip.archived,
+            Trip.currency,
+            Trip.image_id,
+            Image.filename.label("image_filename"),
+            func.coalesce(day_stats.c.days, 0).label("days"),
+            day_stats.c.start_date,
+            day_stats.c.end_date,
+            func.coalesce(place_stats.c.place_count, 0).label("place_count"),
+            func.coalesce(item_stats.c.item_count, 0).label("item_count"),
+            func.coalesce(item_stats.c.total_price, 0).label("total_price"),
+        )
+        .outerjoin(Image, Image.id == Trip.image_id)
+        .outerjoin(day_stats, day_stats.c.trip_id == Trip.id)
+        .outerjoin(item_stats, item_stats.c.trip_id == Trip.id)
+        .outerjoin(place_stats, place_stats.c.trip_id == Trip.id)
+        .where(Trip.id.in_(trip_ids))
+    ).all()
+
+    memberships: dict[int, list[TripMember]] = {}
+    if rows:
+        for member in session.exec(select(TripMember).where(TripMember.trip_id.in_([r.id for r in rows]))):
+            memberships.setdefault(member.trip_id, []).append(member)
+
+    return ModelResponse([TripSummaryRead.from_row(row, memberships.get(row.id, [])) for row in rows])
 
 
 @router.get("/invitations", response_model=list[TripInvitationRead])
@@ -115,30 +264,135 @@ def has_pending_invitations(
     return bool(pending)
 
 
-@router.get("/{trip_id}", response_model=TripRead)
-def read_trip(
-    session: SessionDep, trip_id: int, current_user: Annotated[str, Depends(get_current_username)]
-) -> TripRead:
-    db_trip = session.exec(
-        select(Trip)
-        .options(
-            selectinload(Trip.days).selectinload(TripDay.items),
-            selectinload(Trip.days).selectinload(TripDay.bookings),
-            selectinload(Trip.places),
-            selectinload(Trip.image),
-            selectinload(Trip.memberships),
-        )
+def _trip_revision_or_404(session, trip_id: int, username: str) -> int:
+    revision = session.exec(
+        select(Trip.revision)
         .outerjoin(TripMember)
         .where(
             Trip.id == trip_id,
-            (Trip.user == current_user)
-            | ((TripMember.user == current_user) & (TripMember.joined_at.is_not(None))),
+            (Trip.user == username) | ((TripMember.user == username) & (TripMember.joined_at.is_not(None))),
         )
     ).first()
-
-    if not db_trip:
+    if revision is None:
         raise HTTPException(status_code=404, detail="Not found")
-    return TripRead.serialize(db_trip)
+    return revision
+
+
+@router.get("/{trip_id}", response_model=TripRead, responses=CONDITIONAL_RESPONSES)
+def read_trip(
+    request: Request,
+    session: SessionDep,
+    trip_id: int,
+    current_user: Annotated[str, Depends(get_current_username)],
+    fieldset: Annotated[Fieldset, Depends(fieldset_of(TripRead))],
+) -> TripRead:
+    revision = _trip_revision_or_404(session, trip_id, current_user)
+
+    # Revision read before the graph: a concurrent write can only make the body newer than its ETag
+    etag = revision_etag(request, trip_id, revision)
+    if response := not_modified(request, etag):
+        return response
+
+    def build() -> TripRead:
+        db_trip = session.exec(
+            select(Trip).options(*_trip_read_options(fieldset)).where(Trip.id == trip_id)
+        ).first()
+        if not db_trip:
+            raise HTTPException(status_code=404, detail="Not found")
+        return TripRead.serialize(db_trip, _place_trip_counts(session, _shown_places(db_trip), fieldset))
+
+    if not fieldset.selects_all:
+        return model_response(request, build(), fieldset, etag)
+    # Same body for every member, and for full access share links
+    return cached_model_response(request, get_trip_read_cache(), (trip_id, revision, "full"), build, etag)
+
+
+@router.get("/{trip_id}/changes", response_model=TripChangesRead, responses=MSGPACK_RESPONSES)
+def read_trip_changes(
+    request: Request,
+    session: SessionDep,
+    trip_id: int,
+    since: Annotated[int, Query(ge=0)],
+    current_user: Annotated[str, Depends(get_current_username)],
+) -> TripChangesRead:
+    revision = _trip_revision_or_404(session, trip_id, current_user)
+    if since >= revision:
+        return model_response(request, TripChangesRead(revision=revision, reset=since > revision))
+
+    changes = session.exec(
+        select(TripChange.revision, TripChange.entity, TripChange.entity_id, TripChange.deleted)
+        .where(TripChange.trip_id == trip_id, TripChange.revision > since, TripChange.revision <= revision)
+        .order_by(TripChange.revision, TripChange.id)
+    ).all()
+    # Every revision logs at least one change: a gap means a pruned (or pre change log) history
+    if not changes or changes[0].revision != since + 1 or any(c.entity == "trip" for c in changes):
+        return model_response(request, TripChangesRead(revision=revision, reset=True))
+
+    # Latest state per row wins
+    latest = {(c.entity, c.entity_id): c.deleted for c in changes}
+    upserted = {entity: set() for entity in ("days", "items", "bookings", "packing", "checklist")}
+    for (entity, entity_id), deleted in latest.items():
+        if not deleted:
+            upserted[entity].add(entity_id)
+
+    days = session.exec(select(TripDay).where(TripDay.trip_id == trip_id, TripDay.id.in_(upserted["days"])))
+    items = session.exec(
+        select(TripItem)
+        .options(
+            selectinload(TripItem.place).options(
+                selectinload(Place.category).selectinload(Category.image),
+                selectinload(Place.image),
+            ),
+            selectinload(TripItem.image),
+            selectinload(TripItem.attachments),
+        )
+        .join(TripDay)
+        .where(TripDay.trip_id == trip_id, TripItem.id.in_(upserted["items"]))
+    ).all()
+    trip_counts = _place_trip_counts(session, [item.place for item in items if item.place])
+    bookings = session.exec(
+        select(TripBooking).where(TripBooking.trip_id == trip_id, TripBooking.id.in_(upserted["bookings"]))
+    )
+    packing = session.exec(
+        select(TripPackingListItem).where(
+            TripPackingListItem.trip_id == trip_id, TripPackingListItem.id.in_(upserted["packing"])
+        )
+    )
+    checklist = session.exec(
+        select(TripChecklistItem).where(
+            TripChecklistItem.trip_id == trip_id, TripChecklistItem.id.in_(upserted["checklist"])
+        )
+    )
+    delta = TripChangesRead(
+        revision=revision,
+        days=[TripDayChangeRead.model_validate(day) for day in days],
+        items=[TripItemRead.serialize(item, trip_counts) for item in items],
+        bookings=[TripBookingChangeRead.model_validate(booking) for booking in bookings],
+        packing=[TripPackingListItemRead.serialize(item) for item in packing],
+        checklist=[TripChecklistItemRead.serialize(item) for item in checklist],
+    )
+
+    # Logged as changed but gone (deleted or moved since): tombstones as well
+    for entity, ids in upserted.items():
+        ids.difference_update(row.id for row in getattr(delta, entity))
+    for (entity, entity_id), deleted in latest.items():
+        if deleted or entity_id in upserted[entity]:
+            delta.deleted.setdefault(entity, []).append(entity_id)
+    return model_response(request, delta)
+
+
+@router.get("/{trip_id}/events", response_class=StreamingResponse)
+def read_trip_events(
+    trip_id: int,
+    current_user: Annotated[str, Depends(get_current_username)],
+) -> StreamingResponse:
+    # Notifications only ({trip_id, revision, entities}), the client pulls GET /changes?since= on each.
+    # Own session, closed before streaming: a request one lives as long as the stream
+    with RoutingSession() as session:
+        revision = _trip_revision_or_404(session, trip_id, current_user)
+    return StreamingResponse(
+        trip_events.stream(trip_id, revision), media_type="text/event-stream", headers=SSE_HEADERS
+    )
 
 
 @router.post("", response_model=TripReadBase)
@@ -652,9 +906,17 @@ def read_packing_list(
     current_user: Annotated[str, Depends(get_current_username)],
 ) -> list[TripPackingListItemRead]:
     _get_verified_trip(session, trip_id, current_user)
-    p_items = session.exec(select(TripPackingListItem).where(TripPackingListItem.trip_id == trip_id))
+    p_items = session.exec(
+        select(
+            TripPackingListItem.id,
+            TripPackingListItem.text,
+            TripPackingListItem.qt,
+            TripPackingListItem.category,
+            TripPackingListItem.packed,
+        ).where(TripPackingListItem.trip_id == trip_id)
+    )
 
-    return [TripPackingListItemRead.serialize(i) for i in p_items]
+    return ModelResponse([TripPackingListItemRead.serialize(i) for i in p_items])
 
 
 @router.post("/{trip_id}/packing", response_model=TripPackingListItemRead)
@@ -699,6 +961,15 @@ def update_packing_item(
         raise HTTPException(status_code=404, detail="Not found")
 
     item_data = p_item.model_dump(exclude_unset=True)
+    if item_data and (committer := get_group_committer()):
+        committer.submit(
+            update(TripPackingListItem).where(TripPackingListItem.id == p_id).values(**item_data)
+        ).result()
+        session.expunge(db_item)
+        for key, value in item_data.items():
+            setattr(db_item, key, value)
+        return TripPackingListItemRead.serialize(db_item)
+
     for key, value in item_data.items():
         setattr(db_item, key, value)
 
@@ -741,8 +1012,12 @@ def read_checklist(
     current_user: Annotated[str, Depends(get_current_username)],
 ) -> list[TripChecklistItemRead]:
     _get_verified_trip(session, trip_id, current_user)
-    items = session.exec(select(TripChecklistItem).where(TripChecklistItem.trip_id == trip_id))
-    return [TripChecklistItemRead.serialize(i) for i in items]
+    items = session.exec(
+        select(TripChecklistItem.id, TripChecklistItem.text, TripChecklistItem.checked).where(
+            TripChecklistItem.trip_id == trip_id
+        )
+    )
+    return ModelResponse([TripChecklistItemRead.serialize(i) for i in items])
 
 
 @router.post("/{trip_id}/checklist", response_model=TripChecklistItemRead)
@@ -785,6 +1060,15 @@ def update_checklist_item(
         raise HTTPException(status_code=404, detail="Not found")
 
     item_data = item.model_dump(exclude_unset=True)
+    if item_data and (committer := get_group_committer()):
+        committer.submit(
+            update(TripChecklistItem).where(TripChecklistItem.id == id).values(**item_data)
+        ).result()
+        session.expunge(db_item)
+        for key, value in item_data.items():
+            setattr(db_item, key, value)
+        return TripChecklistItemRead.serialize(db_item)
+
     for key, value in item_data.items():
         setattr(db_item, key, value)
 
@@ -1002,21 +1286,96 @@ async def delete_trip_attachment(
     return {}
 
 
-@router.get("/shared/{token}", response_model=TripRead | TripShareRead)
-def read_shared_trip(
-    session: SessionDep,
-    token: str,
-) -> TripRead | TripShareRead:
-    share = _trip_from_token_or_404(session, token)
-    db_trip = session.get(Trip, share.trip_id)
-    if not db_trip:
+def _shared_trip_build(session, trip_id: int, full_access: bool):
+    def build() -> TripRead | TripShareRead:
+        db_trip = session.exec(select(Trip).options(*_trip_read_options()).where(Trip.id == trip_id)).first()
+        if not db_trip:
+            raise HTTPException(status_code=404, detail="Not found")
+        trip_counts = _place_trip_counts(session, _shown_places(db_trip))
+        if full_access:
+            return TripRead.serialize(db_trip, trip_counts)
+        return TripShareRead.serialize(db_trip, trip_counts)
+
+    return build
+
+
+def _render_shared_trip(request: Request, token: str) -> tuple[int, Response]:
+    # (current revision, response) rendered from the database, then published as the link snapshot
+    with RoutingSession() as session:
+        trip_id, is_full_access, revision = _share_revision_or_404(session, token)
+        # Share access level changes bump the revision too
+        etag = revision_etag(request, trip_id, revision)
+        if response := not_modified(request, etag):
+            return revision, response
+
+        key = (trip_id, revision, "full" if is_full_access else "share")
+        build = _shared_trip_build(session, trip_id, is_full_access)
+        response = cached_model_response(request, get_trip_read_cache(), key, build, etag)
+        if response.media_type != ModelResponse.media_type:
+            return revision, response
+        if get_share_snapshots().publish(token, trip_id, revision, response.body):
+            # A commit may have removed the link snapshot before it was published: checked again
+            session.rollback()
+            if _share_revision(session, token) != (trip_id, is_full_access, revision):
+                get_share_snapshots().discard([token])
+    response.headers["Cache-Control"] = SNAPSHOT_CACHE_CONTROL
+    response.headers["Content-Location"] = f"/api/trips/shared/{token}/snapshots/{revision}"
+    return revision, response
+
+
+def _snapshot_response(request: Request, token: str, snapshot: Snapshot) -> Response | None:
+    headers = {
+        "ETag": snapshot.etag,
+        "Vary": "Accept",
+        "Cache-Control": SNAPSHOT_CACHE_CONTROL,
+        "Content-Location": f"/api/trips/shared/{token}/snapshots/{snapshot.revision}",
+    }
+    if not_modified(request, snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    if (body := snapshot.read()) is None:
+        return None
+    return Response(body, media_type=ModelResponse.media_type, headers=headers)
+
+
+@router.get("/shared/{token}", response_model=TripRead | TripShareRead, responses=CONDITIONAL_RESPONSES)
+def read_shared_trip(request: Request, token: str) -> TripRead | TripShareRead:
+    # The link snapshot is served without touching the database, it is removed by any commit changing it
+    snapshot = None if wants_msgpack(request) else get_share_snapshots().get(token)
+    if snapshot and (response := _snapshot_response(request, token, snapshot)):
+        return response
+    return _render_shared_trip(request, token)[1]
+
+
+@router.get("/shared/{token}/snapshots/{revision}", response_model=TripRead | TripShareRead)
+def read_shared_trip_snapshot(request: Request, token: str, revision: int) -> TripRead | TripShareRead:
+    # JSON of the link at `revision`, while it is the current one
+    snapshot = get_share_snapshots().get(token)
+    if snapshot and snapshot.revision == revision:
+        if response := _snapshot_response(request, token, snapshot):
+            return response
+    elif snapshot or wants_msgpack(request):
+        raise HTTPException(status_code=404, detail="Not found")
+    current_revision, response = _render_shared_trip(request, token)
+    if current_revision != revision:
         raise HTTPException(status_code=404, detail="Not found")
+    return response
 
-    return TripRead.serialize(db_trip) if share.is_full_access else TripShareRead.serialize(db_trip)
+
+@router.get("/shared/{token}/events", response_class=StreamingResponse)
+def read_shared_trip_events(token: str) -> StreamingResponse:
+    # Own session, closed before streaming (see read_trip_events)
+    with RoutingSession() as session:
+        trip_id, _, revision = _share_revision_or_404(session, token)
+    return StreamingResponse(
+        trip_events.stream(trip_id, revision), media_type="text/event-stream", headers=SSE_HEADERS
+    )
 
 
-@router.get("/shared/{token}/packing", response_model=list[TripPackingListItemRead])
+@router.get(
+    "/shared/{token}/packing", response_model=list[TripPackingListItemRead], responses=MSGPACK_RESPONSES
+)
 def read_shared_trip_packing_list(
+    request: Request,
     session: SessionDep,
     token: str,
 ) -> list[TripPackingListItemRead]:
@@ -1025,11 +1384,14 @@ def read_shared_trip_packing_list(
             TripPackingListItem.trip_id == _trip_from_token_or_404(session, token).trip_id
         )
     )
-    return [TripPackingListItemRead.serialize(i) for i in p_items]
+    return model_response(request, [TripPackingListItemRead.serialize(i) for i in p_items])
 
 
-@router.get("/shared/{token}/checklist", response_model=list[TripChecklistItemRead])
+@router.get(
+    "/shared/{token}/checklist", response_model=list[TripChecklistItemRead], responses=MSGPACK_RESPONSES
+)
 def read_shared_trip_checklist(
+    request: Request,
     session: SessionDep,
     token: str,
 ) -> list[TripChecklistItemRead]:
@@ -1038,7 +1400,7 @@ def read_shared_trip_checklist(
             TripChecklistItem.trip_id == _trip_from_token_or_404(session, token).trip_id
         )
     )
-    return [TripChecklistItemRead.serialize(i) for i in items]
+    return model_response(request, [TripChecklistItemRead.serialize(i) for i in items])
 
 
 @router.get("/shared/{token}/attachments/{attachment_id}/download")
@@ -1,37 +1,49 @@
 from datetime import UTC, datetime, timedelta
+from functools import lru_cache
 
 import jwt
-import pyotp
-from argon2 import PasswordHasher
-from argon2 import exceptions as argon_exceptions
-from authlib.integrations.httpx_client import OAuth2Client
 from fastapi import HTTPException
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .config import get_settings
 from .models.models import Token, User
 from .utils.utils import httpx_get
 
-ph = PasswordHasher()
 OIDC_CONFIG = {}
 
+# argon2, pyotp and authlib are imported on first use, most requests never need them
+
+
+@lru_cache
+def _password_hasher():
+    from argon2 import PasswordHasher
+
+    return PasswordHasher()
+
 
 def generate_totp_secret() -> str:
+    import pyotp
+
     return pyotp.random_base32()
 
 
 def verify_totp_code(secret: str, code: str) -> bool:
+    import pyotp
+
     totp = pyotp.TOTP(secret)
     return totp.verify(code)
 
 
 def hash_password(password: str) -> str:
-    return ph.hash(password)
+    return _password_hasher().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    from argon2 import exceptions as argon_exceptions
+
     try:
-        return ph.verify(hashed_password, plain_password)
+        return _password_hasher().verify(hashed_password, plain_password)
     except (
         argon_exceptions.VerifyMismatchError,
         argon_exceptions.VerificationError,
@@ -78,7 +90,19 @@ def api_token_to_user(session: Session, api_token: str) -> User | None:
     return user
 
 
+async def async_api_token_to_user(session: AsyncSession, api_token: str) -> User | None:
+    if not api_token:
+        raise HTTPException(status_code=400, detail="Bad Request")
+
+    user = (await session.exec(select(User).where(User.api_token == api_token))).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid Token")
+    return user
+
+
 def get_oidc_client():
+    from authlib.integrations.httpx_client import OAuth2Client
+
     return OAuth2Client(
         client_id=get_settings().OIDC_CLIENT_ID,
         client_secret=get_settings().OIDC_CLIENT_SECRET,
@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from functools import lru_cache
+
+from ..config import get_settings
+
+# (trip id, revision, representation...)
+Key = tuple
+
+
+class EncodedCache:
+    """
+    Bounded LRU of encoded response bodies, keyed by trip id and revision: a new revision is a
+    new key, so a stale body is never served, and invalidate() only frees the memory.
+    Concurrent misses on a key wait for the first one to build it (single-flight).
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Key, bytes] = OrderedDict()
+        self._keys_by_trip: dict[int, set[Key]] = {}
+        self._latest: dict[int, int] = {}
+        self._building: dict[Key, Future] = {}
+
+    def get_or_build(self, key: Key, build: Callable[[], bytes]) -> bytes:
+        if self.max_bytes <= 0:
+            return build()
+
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                return body
+            future = self._building.get(key)
+            owner = future is None
+            if owner:
+                future = self._building[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            body = build()
+        except BaseException as exc:
+            with self._lock:
+                del self._building[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            del self._building[key]
+            self._store(key, body)
+        future.set_result(body)
+        return body
+
+    def invalidate(self, trip_id: int, revision: int):
+        # Called once `revision` is committed: older entries of the trip can no longer be hit
+        with self._lock:
+            if revision <= self._latest.get(trip_id, -1):
+                return
+            self._latest[trip_id] = revision
+            for key in [k for k in self._keys_by_trip.get(trip_id, ()) if k[1] < revision]:
+                self._remove(key)
+
+    def _store(self, key: Key, body: bytes):
+        trip_id, revision = key[0], key[1]
+        # Built from a revision committed over meanwhile, or too large to be kept
+        if revision < self._latest.get(trip_id, -1) or len(body) > self.max_bytes:
+            return
+        self._entries[key] = body
+        self._keys_by_trip.setdefault(trip_id, set()).add(key)
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: Key):
+        self.size -= len(self._entries.pop(key))
+        keys = self._keys_by_trip[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_trip[key[0]]
+
+
+@lru_cache
+def get_trip_read_cache() -> EncodedCache:
+    return EncodedCache(get_settings().TRIP_READ_CACHE_SIZE)
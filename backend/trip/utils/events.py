@@ -0,0 +1,91 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+from pydantic_core import to_json
+
+# An idle stream gets a comment line, keeps proxies from closing it
+KEEPALIVE_SECONDS = 15
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_message(event: str, revision: int, data: dict) -> bytes:
+    # id is the trip revision: a client reconnects with Last-Event-ID and syncs from there
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (revision, event.encode(), to_json(data))
+
+
+class _Subscriber:
+    __slots__ = ("pending", "closing", "wakeup")
+
+    def __init__(self, pending: bytes):
+        self.pending: bytes | None = pending
+        # The stream ends once `pending` is sent
+        self.closing = False
+        self.wakeup = asyncio.Event()
+
+
+class TripEventHub:
+    """
+    In-process fan-out of trip change notifications to SSE streams (one worker).
+    A notification is encoded once for every subscriber of the trip, and each subscriber only
+    holds the latest one: a slow client skips to the newest revision instead of buffering.
+    Access is checked when a stream opens: streams are closed after the notification removing
+    a member or a share link (clients reconnect and are checked again), and on trip deletion.
+    """
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._subscribers: dict[int, set[_Subscriber]] = {}
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+
+    def publish(self, trip_id: int, revision: int, entities: list[str], close: bool = False):
+        # Called from commit hooks, in threadpool threads as well as on the event loop
+        if self._loop is None or trip_id not in self._subscribers:
+            return
+        data = {"trip_id": trip_id, "revision": revision, "entities": entities}
+        message = sse_message("change", revision, data)
+        self._loop.call_soon_threadsafe(self._fan_out, trip_id, message, close)
+
+    def publish_deleted(self, trip_id: int, revision: int):
+        if self._loop is None or trip_id not in self._subscribers:
+            return
+        message = sse_message("deleted", revision, {"trip_id": trip_id, "revision": revision})
+        self._loop.call_soon_threadsafe(self._fan_out, trip_id, message, True)
+
+    def _fan_out(self, trip_id: int, message: bytes, close: bool):
+        for subscriber in self._subscribers.get(trip_id, ()):
+            # A closing notification is not replaced by a later one
+            if not subscriber.closing:
+                subscriber.pending = message
+                subscriber.closing = close
+            subscriber.wakeup.set()
+
+    async def stream(self, trip_id: int, revision: int) -> AsyncIterator[bytes]:
+        # First message: the current revision, to compare with what the client has
+        data = {"trip_id": trip_id, "revision": revision}
+        subscriber = _Subscriber(sse_message("revision", revision, data))
+        self._subscribers.setdefault(trip_id, set()).add(subscriber)
+        try:
+            while True:
+                if subscriber.pending is None:
+                    try:
+                        await asyncio.wait_for(subscriber.wakeup.wait(), KEEPALIVE_SECONDS)
+                    except TimeoutError:
+                        yield b": keepalive\n\n"
+                        continue
+                subscriber.wakeup.clear()
+                message, subscriber.pending = subscriber.pending, None
+                if message:
+                    yield message
+                if subscriber.closing:
+                    return
+        finally:
+            subscribers = self._subscribers.get(trip_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[trip_id]
+
+
+trip_events = TripEventHub()
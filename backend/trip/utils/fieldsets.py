@@ -0,0 +1,92 @@
+from types import UnionType
+from typing import Union, get_args, get_origin
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+Path = tuple[str, ...]
+
+
+def _field_model(annotation) -> tuple[type[BaseModel] | None, bool]:
+    # Model behind a field annotation (Model, Model | None, list[Model]) and whether it is a list
+    is_list = get_origin(annotation) is list
+    if is_list:
+        annotation = get_args(annotation)[0]
+    if get_origin(annotation) in (Union, UnionType):
+        annotation = next((arg for arg in get_args(annotation) if arg is not type(None)), None)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, is_list
+    return None, is_list
+
+
+def _parse(model: type[BaseModel], value: str | None) -> list[Path]:
+    paths = []
+    for raw in (value or "").split(","):
+        if not (raw := raw.strip()):
+            continue
+        current = model
+        for name in raw.split("."):
+            if current is None or name not in current.model_fields:
+                raise HTTPException(status_code=400, detail=f"Unknown field: {raw}")
+            current, _ = _field_model(current.model_fields[name].annotation)
+        paths.append(tuple(raw.split(".")))
+    return paths
+
+
+def _spec(model: type[BaseModel], paths: list[Path]) -> dict:
+    # Dotted paths to pydantic include/exclude: {"days": {"__all__": {"items": {"__all__": {"gpx": True}}}}}
+    spec = {}
+    for path in sorted(paths, key=len):
+        node, current = spec, model
+        for depth, name in enumerate(path):
+            if node.get(name) is True:
+                # A shorter path already covers it
+                break
+            if depth == len(path) - 1:
+                node[name] = True
+                break
+            current, is_list = _field_model(current.model_fields[name].annotation)
+            child = node.setdefault(name, {})
+            node = child.setdefault("__all__", {}) if is_list else child
+    return spec
+
+
+class Fieldset:
+    """
+    Sparse fieldset from ?fields= and ?exclude=: comma separated response fields, dotted for
+    nested ones (e.g. exclude=notes,days.items.gpx). Applied when the response is encoded, and
+    used by routes to skip loading what is not returned.
+    """
+
+    def __init__(self, model: type[BaseModel], fields: str | None = None, exclude: str | None = None):
+        self.include_paths = _parse(model, fields) or None
+        self.exclude_paths = _parse(model, exclude)
+        self.include = _spec(model, self.include_paths) if self.include_paths else None
+        self.exclude = _spec(model, self.exclude_paths) or None
+
+    @property
+    def selects_all(self) -> bool:
+        return self.include_paths is None and not self.exclude_paths
+
+    def wants(self, path: str) -> bool:
+        parts = tuple(path.split("."))
+        if any(parts[: len(p)] == p for p in self.exclude_paths):
+            return False
+        if self.include_paths is None:
+            return True
+        # Either the path is included, or it leads to an included nested field
+        return any(parts[: len(p)] == p or p[: len(parts)] == parts for p in self.include_paths)
+
+    def encode_options(self, many: bool = False) -> dict:
+        options = {"include": self.include, "exclude": self.exclude}
+        if many:
+            # Applied to each element of a list response
+            options = {key: {"__all__": spec} if spec else None for key, spec in options.items()}
+        return options
+
+
+def fieldset_of(model: type[BaseModel]):
+    def get_fieldset(fields: str | None = None, exclude: str | None = None) -> Fieldset:
+        return Fieldset(model, fields, exclude)
+
+    return get_fieldset
@@ -1,7 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Any
 
-import httpx
 from fastapi import HTTPException
 
 from ...models.models import ProviderPlaceResult, RoutingQuery, RoutingResponse
@@ -47,6 +46,8 @@ class BaseMapProvider(ABC):
         json: dict[str, Any] | None = None,
         follow_redirects: bool = False,
     ) -> dict[str, Any] | str:
+        import httpx
+
         try:
             async with httpx.AsyncClient(timeout=self.TIMEOUT) as client:
                 response = await client.request(
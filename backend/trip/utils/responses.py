@@ -0,0 +1,152 @@
+from collections.abc import Callable, Iterable, Iterator
+from itertools import batched
+
+import msgpack
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic_core import to_json, to_jsonable_python
+
+from .. import __version__
+from .cache import EncodedCache, Key
+from .fieldsets import Fieldset
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Accept ranges matching JSON, the most specific first
+JSON_MEDIA_RANGES = ("application/json", "application/*", "*/*")
+# Items encoded per chunk written to the socket
+STREAM_CHUNK_SIZE = 100
+
+# OpenAPI: routes answering with model_response also serve MessagePack
+MSGPACK_RESPONSES = {200: {"content": {"application/msgpack": {}}}}
+# ...and routes with an ETag answer If-None-Match
+CONDITIONAL_RESPONSES = {**MSGPACK_RESPONSES, 304: {"description": "Not Modified"}}
+# ...and routes with stream_response also serve NDJSON
+STREAM_RESPONSES = {200: {"content": {"application/msgpack": {}, NDJSON_MEDIA_TYPE: {}}}}
+
+
+class ModelResponse(JSONResponse):
+    """
+    Response for *Read models built by their serialize classmethods, already validated:
+    encoded in one pass by pydantic-core instead of FastAPI re-validating them against
+    response_model and walking them with jsonable_encoder.
+    """
+
+    def __init__(self, content, fieldset: Fieldset | None = None, **kwargs):
+        # render() runs in Response.__init__
+        self.encode_options = fieldset.encode_options(many=isinstance(content, list)) if fieldset else {}
+        super().__init__(content, **kwargs)
+
+    def render(self, content) -> bytes:
+        return to_json(content, **self.encode_options)
+
+
+class MsgPackResponse(ModelResponse):
+    media_type = "application/msgpack"
+
+    def render(self, content) -> bytes:
+        # Same document as ModelResponse (dates as ISO strings), floats kept binary
+        return msgpack.packb(to_jsonable_python(content, **self.encode_options))
+
+
+def _accepted(request: Request) -> dict[str, float]:
+    # Accept media ranges -> quality (RFC 9110 12.5.1)
+    qualities: dict[str, float] = {}
+    for media_range in request.headers.get("accept", "").split(","):
+        media_type, *params = (part.strip() for part in media_range.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    quality = 0.0
+        if media_type:
+            qualities[media_type.lower()] = quality
+    return qualities
+
+
+def _prefers(request: Request, media_types: Iterable[str]) -> bool:
+    # Asked for explicitly, and not less than JSON, rated by its most specific range
+    accepted = _accepted(request)
+    quality = max((accepted.get(media_type, 0.0) for media_type in media_types), default=0.0)
+    json_quality = next((accepted[r] for r in JSON_MEDIA_RANGES if r in accepted), 0.0)
+    return quality > 0 and quality >= json_quality
+
+
+def wants_msgpack(request: Request) -> bool:
+    return _prefers(request, MSGPACK_MEDIA_TYPES)
+
+
+def model_response(
+    request: Request, content, fieldset: Fieldset | None = None, etag: str | None = None
+) -> Response:
+    # Accept negotiation: MessagePack when the client asks for it, JSON otherwise
+    response_class = MsgPackResponse if wants_msgpack(request) else ModelResponse
+    headers = {"Vary": "Accept"}
+    if etag:
+        headers["ETag"] = etag
+    return response_class(content, fieldset=fieldset, headers=headers)
+
+
+def cached_model_response(
+    request: Request, cache: EncodedCache, key: Key, build: Callable[[], object], etag: str
+) -> Response:
+    # Body encoded once per key and representation, then served as is to every reader
+    response_class = MsgPackResponse if wants_msgpack(request) else ModelResponse
+    body = cached_body(cache, key, build, response_class)
+    return Response(body, media_type=response_class.media_type, headers={"Vary": "Accept", "ETag": etag})
+
+
+def cached_body(
+    cache: EncodedCache,
+    key: Key,
+    build: Callable[[], object],
+    response_class: type[ModelResponse] = ModelResponse,
+) -> bytes:
+    return cache.get_or_build((*key, response_class.media_type), lambda: response_class(build()).body)
+
+
+def revision_etag(request: Request, key: int, revision: int) -> str:
+    # Strong validator, one per representation and release: MessagePack and JSON bodies differ,
+    # and an upgrade may change what the same revision renders to
+    suffix = "-msgpack" if wants_msgpack(request) else ""
+    return f'"{key}-{revision}-{__version__}{suffix}"'
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept"})
+    return None
+
+
+def wants_ndjson(request: Request) -> bool:
+    return _prefers(request, (NDJSON_MEDIA_TYPE,))
+
+
+def _json_array_chunks(items: Iterable, encode_options: dict) -> Iterator[bytes]:
+    yield b"["
+    separator = b""
+    for chunk in batched(items, STREAM_CHUNK_SIZE):
+        yield separator + b",".join(to_json(item, **encode_options) for item in chunk)
+        separator = b","
+    yield b"]"
+
+
+def _ndjson_chunks(items: Iterable, encode_options: dict) -> Iterator[bytes]:
+    for chunk in batched(items, STREAM_CHUNK_SIZE):
+        yield b"".join(to_json(item, **encode_options) + b"\n" for item in chunk)
+
+
+def stream_response(request: Request, items: Iterable, fieldset: Fieldset | None = None) -> StreamingResponse:
+    # Items are encoded as they are produced: memory bounded by a chunk, not by the list
+    encode_options = fieldset.encode_options() if fieldset else {}
+    if wants_ndjson(request):
+        chunks, media_type = _ndjson_chunks(items, encode_options), NDJSON_MEDIA_TYPE
+    else:
+        chunks, media_type = _json_array_chunks(items, encode_options), "application/json"
+    return StreamingResponse(chunks, media_type=media_type, headers={"Vary": "Accept"})
@@ -0,0 +1,108 @@
+import os
+import re
+import shutil
+import threading
+from collections.abc import Iterable
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+from .. import __version__
+from ..config import get_settings
+
+# Revalidated with the ETag: a revoked link stops being served by caches
+SNAPSHOT_CACHE_CONTROL = "no-cache"
+
+# Share tokens are urlsafe base64, anything else is not a folder of ours
+_TOKEN_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def snapshot_etag(trip_id: int, revision: int) -> str:
+    # Same validator as the JSON rendered from the database (responses.revision_etag)
+    return f'"{trip_id}-{revision}-{__version__}"'
+
+
+class Snapshot(NamedTuple):
+    trip_id: int
+    revision: int
+    path: Path
+
+    @property
+    def etag(self) -> str:
+        return snapshot_etag(self.trip_id, self.revision)
+
+    def read(self) -> bytes | None:
+        try:
+            return self.path.read_bytes()
+        except FileNotFoundError:
+            # Removed by a commit meanwhile
+            return None
+
+
+class ShareSnapshots:
+    """
+    Rendered JSON of shared trips, one file per share token, served without touching the database.
+    The folder is the only state, shared by the workers using it: the commits changing a shared
+    trip, revoking a link or deleting a trip or user remove the folders of its links
+    (db.revisions), the next view renders the link again. Files are kept per release.
+    Unless started, nothing is published or served.
+    """
+
+    def __init__(self, folder: str):
+        self.root = Path(folder)
+        self.folder = self.root / __version__
+        self.enabled = False
+
+    def start(self):
+        # Bodies rendered by other releases are never served again
+        if self.root.is_dir():
+            for fp in self.root.iterdir():
+                if fp.name != __version__:
+                    shutil.rmtree(fp, ignore_errors=True)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def get(self, token: str) -> Snapshot | None:
+        if not self.enabled or not _TOKEN_RE.match(token):
+            return None
+        try:
+            names = os.listdir(self.folder / token)
+        except FileNotFoundError:
+            return None
+        for name in names:
+            # {trip id}-{revision}.json
+            if name.endswith(".json"):
+                trip_id, revision = name.removesuffix(".json").split("-")
+                return Snapshot(int(trip_id), int(revision), self.folder / token / name)
+        return None
+
+    def publish(self, token: str, trip_id: int, revision: int, body: bytes) -> bool:
+        if not self.enabled or not _TOKEN_RE.match(token):
+            return False
+
+        path = self.folder / token / f"{trip_id}-{revision}.json"
+        path.parent.mkdir(exist_ok=True)
+        # Workers may render the same link at once
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+        for fp in path.parent.glob("*.json"):
+            if fp != path:
+                fp.unlink(missing_ok=True)
+        return True
+
+    def discard(self, tokens: Iterable[str]):
+        # Called once committed, in every release folder: a worker not upgraded yet still serves its own
+        folders = [fp for fp in self.root.iterdir() if fp.is_dir()] if self.root.is_dir() else []
+        for token in tokens:
+            if _TOKEN_RE.match(token):
+                for folder in folders:
+                    shutil.rmtree(folder / token, ignore_errors=True)
+
+
+@lru_cache
+def get_share_snapshots() -> ShareSnapshots:
+    return ShareSnapshots(get_settings().SNAPSHOTS_FOLDER)
@@ -6,9 +6,7 @@ from pathlib import Path
 from secrets import token_urlsafe
 from uuid import uuid4
 
-import httpx
 from fastapi import HTTPException, UploadFile
-from PIL import Image
 
 from .. import __version__
 from ..config import get_settings
@@ -80,6 +78,8 @@ def remove_image(filename: str):
 
 
 async def httpx_get(link: str) -> dict:
+    import httpx
+
     headers = {
         "User-Agent": "Mozilla/5.0 (compatible; TRIP/1 PyJWKClient; +https://github.com/itskovacs/trip)",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
@@ -97,6 +97,8 @@ async def httpx_get(link: str) -> dict:
 
 
 async def download_file(link: str) -> tuple[str, int]:
+    import httpx
+
     if not link[:4] == "http":
         raise HTTPException(status_code=400, detail="Bad Request")
 
@@ -131,6 +133,8 @@ async def download_file(link: str) -> tuple[str, int]:
 
 
 async def check_update():
+    import httpx
+
     url = "https://api.github.com/repos/itskovacs/trip/releases/latest"
     try:
         async with httpx.AsyncClient(follow_redirects=True, timeout=5) as client:
@@ -148,6 +152,8 @@ async def check_update():
 
 
 def patch_image(fp: str, size: int = 400) -> bool:
+    from PIL import Image
+
     try:
         with Image.open(fp) as im:
             if im.mode not in ("RGB", "RGBA"):
@@ -182,6 +188,8 @@ def patch_image(fp: str, size: int = 400) -> bool:
 
 
 def save_image_to_file(content: bytes, size: int = 600) -> tuple[str, int]:
+    from PIL import Image
+
     filepath = None
     try:
         with Image.open(BytesIO(content)) as im:
@@ -1,6 +1,8 @@
 import json
 import logging
+import os
 import sqlite3
+import subprocess
 import tempfile
 from pathlib import Path
 from typing import Annotated
@@ -12,7 +14,7 @@ from sqlmodel import Session, select
 
 from .. import __version__ as trip_version
 from ..config import get_settings
-from ..db.core import get_engine
+from ..db.core import RoutingSession, get_database_url, is_sqlite
 from ..deps import SessionDep, get_current_username
 from ..models.models import (Backup, BackupStatus, Category, CategoryRead,
                              Image, Place, PlaceRead, Trip, TripAttachment,
@@ -40,13 +42,39 @@ def _stream_path_to_zip(zipf: ZipFile, path: Path, zip_dir: str):
         zipf.write(fp, f"{zip_dir}/{rel_path}")
 
 
+def _pg_dump(target: str):
+    # libpq URI: pg_dump does not know about the SQLAlchemy driver suffix.
+    # The password goes through the environment, command lines are visible to every local user (ps)
+    url = get_database_url()
+    env = dict(os.environ)
+    if url.password is not None:
+        env["PGPASSWORD"] = url.password
+    # URL.set() ignores None
+    dbname = url._replace(drivername="postgresql", password=None).render_as_string()
+    try:
+        subprocess.run(
+            ["pg_dump", "--format=custom", "--no-owner", f"--file={target}", f"--dbname={dbname}"],
+            check=True,
+            capture_output=True,
+            env=env,
+        )
+    except FileNotFoundError:
+        raise RuntimeError("pg_dump not found, install the PostgreSQL client")
+    except subprocess.CalledProcessError as exc:
+        raise RuntimeError(f"pg_dump failed: {exc.stderr.decode().strip()}")
+
+
 def _admin_backup_export(zip_fp: Path):
     with ZipFile(zip_fp, "w", ZIP_DEFLATED, compresslevel=9) as zipf:
         with tempfile.NamedTemporaryFile() as tmp:
             target = tmp.name
-            with sqlite3.connect(get_settings().SQLITE_FILE) as src, sqlite3.connect(target) as dst:
-                src.backup(dst)
-            zipf.write(target, "trip.sqlite")
+            if is_sqlite():
+                with sqlite3.connect(get_settings().SQLITE_FILE) as src, sqlite3.connect(target) as dst:
+                    src.backup(dst)
+                zipf.write(target, "trip.sqlite")
+            else:
+                _pg_dump(target)
+                zipf.write(target, "trip.pgdump")
 
         _stream_path_to_zip(zipf, assets_folder_path(), "assets")
         _stream_path_to_zip(zipf, attachments_folder_path(), "attachments")
@@ -121,8 +149,7 @@ def _user_backup_export(user: str, backup_dt, zip_fp: Path, session: Session):
 
 
 def process_backup_export(backup_id: int, full: bool = False):
-    engine = get_engine()
-    with Session(engine) as session:
+    with RoutingSession() as session:
         db_backup = session.get(Backup, backup_id)
         if not db_backup:
             return
@@ -133,7 +160,9 @@ def process_backup_export(backup_id: int, full: bool = False):
         backup_dt = dt_utc()
         iso_date = backup_dt.strftime("%Y-%m-%dT%H-%M-%S")
         if full:
-            filename = f"TRIP_{iso_date}_full_backup.zip"
+            # PostgreSQL archives hold a pg_dump, restored by hand with pg_restore (see docs/misc/backup)
+            database = "" if is_sqlite() else "_postgresql"
+            filename = f"TRIP_{iso_date}_full_backup{database}.zip"
         else:
             filename = f"TRIP_{db_backup.user}_{iso_date}_backup.zip"
         backups_dir = Path(get_settings().BACKUPS_FOLDER)
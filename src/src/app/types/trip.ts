@@ -9,6 +9,11 @@ export interface TripBase {
   days: number;
   collaborators: TripMember[];
   currency: string;
+  start_date?: string;
+  end_date?: string;
+  place_count?: number;
+  item_count?: number;
+  total_price?: number;
 }
 
 export interface TripBaseWithDates extends TripBase {
@@ -27,6 +32,7 @@ export interface Trip {
   notes?: string;
   archival_review?: string;
   attachments?: TripAttachment[];
+  revision?: number;
 
   // POST / PUT
   places: Place[];